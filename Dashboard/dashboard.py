@@ -1,18 +1,23 @@
 import streamlit as st
 import pandas as pd
 
+import report_data
+from report_data import feature_defect_stats, likely_cause, overview_stats
+
 st.set_page_config(page_title="Cucumber Test Dashboard", layout="wide")
 
 st.title("Cucumber Test Results Dashboard")
 
-# Upload or load CSV
-def load_data():
-    try:
-        return pd.read_csv(r"c:/Users/yashg1/Desktop/Demoprep/Vertexone/Results/parsed_report.csv")
-    except Exception:
-        return pd.DataFrame()
 
-df = load_data()
+# Results files are read once per version (mtime, size) instead of on every rerun.
+@st.cache_data(show_spinner=False)
+def _load_cached(loader_name, version):
+    return getattr(report_data, loader_name)()
+
+def cached(loader_name, filename):
+    return _load_cached(loader_name, report_data.file_version(filename))
+
+df = cached('load_data', report_data.PARSED_CSV)
 
 
 if df.empty:
@@ -65,40 +70,19 @@ st.markdown("""
 
 
 # --- AI Overview: All variables in one block, summary assigned only once ---
-from collections import Counter
-import re as _re
-total = len(df)
-passed = (df['step_status'] == 'PASSED').sum()
-failed = (df['step_status'] == 'FAILED').sum()
-fail_pct = (failed / total * 100) if total else 0
-unique_features = df['feature_name'].nunique()
-feature_stats = df.groupby('feature_name').agg(
-    total_scenarios = ('scenario_name', 'count'),
-    failed_scenarios = ('step_status', lambda x: (x == 'FAILED').sum())
-).reset_index()
-feature_stats['defect_density'] = feature_stats['failed_scenarios'] / feature_stats['total_scenarios']
-feature_stats['defect_density_pct'] = (feature_stats['defect_density'] * 100).round(2)
-top_feature = feature_stats.sort_values('defect_density', ascending=False).iloc[0] if not feature_stats.empty else None
-most_scenarios_feature = feature_stats.sort_values('total_scenarios', ascending=False).iloc[0] if not feature_stats.empty else None
-most_failed_feature = feature_stats.sort_values('failed_scenarios', ascending=False).iloc[0] if not feature_stats.empty else None
-likely_causes = []
-for ai in df[df['step_status']=='FAILED']['ai_solution'].dropna():
-    match = _re.search(r"Likely Cause:\n([\s\S]*?)Fix Steps:", str(ai))
-    if match:
-        cause = match.group(1).strip()
-        likely_causes.append(cause)
-cause_counts = Counter(likely_causes)
-top_cause = cause_counts.most_common(1)[0][0] if cause_counts else "N/A"
-if 'step_duration_ms' in df.columns and not df['step_duration_ms'].isnull().all():
-    avg_duration = df['step_duration_ms'].mean()
-    max_duration = df['step_duration_ms'].max()
-else:
-    avg_duration = 0
-    max_duration = 0
-if 'ai_solution' in df.columns and not df['ai_solution'].isnull().all():
-    ai_suggestion_pct = (df['ai_solution'].notna().sum() / total * 100) if total else 0
-else:
-    ai_suggestion_pct = 0
+overview = overview_stats(df)
+total = overview['total']
+passed = overview['passed']
+failed = overview['failed']
+fail_pct = overview['fail_pct']
+unique_features = overview['unique_features']
+top_feature = overview['top_feature']
+most_scenarios_feature = overview['most_scenarios_feature']
+most_failed_feature = overview['most_failed_feature']
+top_cause = overview['top_cause']
+avg_duration = overview['avg_duration']
+max_duration = overview['max_duration']
+ai_suggestion_pct = overview['ai_suggestion_pct']
 ai_summary = (
     f"<b>AI Overview:</b> <b>{unique_features}</b> features, <b>{total}</b> scenarios.<br>"
     f"<b>{passed}</b> passed, <b>{failed}</b> failed (<b>{fail_pct:.1f}%</b> fail rate).<br>"
@@ -171,8 +155,8 @@ if search:
 # Summary stats
 
 # Add Pending and Skipped scenario counts
-pending = (df['step_status'].str.upper() == 'PENDING').sum() if 'step_status' in df.columns else 0
-skipped = (df['step_status'].str.upper() == 'SKIPPED').sum() if 'step_status' in df.columns else 0
+pending = overview['pending']
+skipped = overview['skipped']
 
 col1, col2, col3, col4, col5 = st.columns(5)
 col1.metric("Total Scenarios", len(df))
@@ -181,6 +165,31 @@ col3.metric("Failed", (df['step_status'] == 'FAILED').sum())
 col4.metric("Pending", pending)
 col5.metric("Skipped", skipped)
 
+# --- WHAT CHANGED SINCE THE PREVIOUS RUN (from Scripts/diff_runs.py) ---
+run_diff = cached('load_diff', report_data.DIFF_CSV)
+if not run_diff.empty:
+    st.subheader(":blue[What Changed]")
+    change_labels = [
+        ('new_failure', "Newly Failed"),
+        ('fixed', "Fixed"),
+        ('still_failing', "Still Failing"),
+        ('changed_error', "Changed Error"),
+        ('added', "Added"),
+        ('removed', "Removed"),
+    ]
+    change_counts = run_diff['category'].value_counts()
+    for column, (category, label) in zip(st.columns(len(change_labels)), change_labels):
+        column.metric(label, int(change_counts.get(category, 0)))
+    for category, label in change_labels:
+        changed_rows = run_diff[run_diff['category'] == category]
+        if changed_rows.empty or category == 'still_failing':
+            continue
+        with st.expander(f"{label} ({len(changed_rows)})", expanded=category == 'new_failure'):
+            st.dataframe(
+                changed_rows[['feature_name', 'scenario_name', 'previous_status', 'current_status', 'failing_streak', 'error_first_line']],
+                height=min(400, 40 + 35 * len(changed_rows)),
+            )
+
 # --- DEFECT DENSITY BY FEATURE ---
 st.markdown("""
 <style>
@@ -233,14 +242,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Calculate defect density by feature
-feature_stats = df.groupby('feature_name').agg(
-    total_scenarios = ('scenario_name', 'count'),
-    failed_scenarios = ('step_status', lambda x: (x == 'FAILED').sum())
-).reset_index()
-
-# Show defect density as a percentage
-feature_stats['defect_density'] = feature_stats['failed_scenarios'] / feature_stats['total_scenarios']
-feature_stats['defect_density_pct'] = (feature_stats['defect_density'] * 100).round(2)
+feature_stats = feature_defect_stats(df)
 feature_stats = feature_stats.sort_values('defect_density', ascending=False)
 
 # --- Modern Defect Density Table Card (Aligned) ---
@@ -325,7 +327,6 @@ if not failed.empty:
 
     # --- TOP 5 FAILURE REASONS & FAILING TESTS ---
 
-    import re as _re
     from collections import Counter
     st.markdown("""
     <style>
@@ -353,10 +354,8 @@ if not failed.empty:
     likely_causes = []
     cause_examples = {}
     for idx, row in failed.iterrows():
-        ai = row['ai_solution']
-        match = _re.search(r"Likely Cause:\n([\s\S]*?)Fix Steps:", str(ai))
-        if match:
-            cause = match.group(1).strip()
+        cause = likely_cause(row['ai_solution'])
+        if cause:
             likely_causes.append(cause)
             cause_examples.setdefault(cause, []).append(row['scenario_name'])
     cause_counts = Counter(likely_causes)
@@ -448,6 +447,78 @@ if not failed.empty:
         """, unsafe_allow_html=True)
 
 
+# --- EXECUTION TIMELINE (Gantt) ---
+timeline = cached('load_timeline', report_data.TIMELINE_JSON)
+if timeline.get('scenarios'):
+    import altair as alt
+    status_scale = alt.Scale(
+        domain=['PASSED', 'FAILED', 'PENDING', 'SKIPPED', 'UNDEFINED'],
+        range=['#3ddc97', '#ff4040', '#FFD740', '#A5D6FF', '#b0b0b0'],
+    )
+    st.subheader(":blue[Execution Timeline]")
+    run = timeline['run']
+    t1, t2, t3, t4, t5 = st.columns(5)
+    t1.metric("Wall Time", f"{run['wall_ms'] / 1000:.1f} s")
+    t2.metric("Worker Lanes", run['lanes'])
+    t3.metric("Avg. Parallelism", f"{run['avg_parallelism']:.2f}")
+    t4.metric("Idle Time", f"{run['idle_ms'] / 1000:.1f} s", help=f"Lane idle time: {run['lane_idle_ms'] / 1000:.1f} s")
+    t5.metric("Critical Path", f"{run['critical_path_ms'] / 1000:.1f} s", help=f"Waiting on the critical lane: {run['critical_path_wait_ms'] / 1000:.1f} s")
+
+    critical_ids = {c['scenario_run_id'] for c in timeline['critical_path']}
+    gantt = pd.DataFrame(timeline['scenarios'])
+    gantt['start_s'] = gantt['start_ms'] / 1000
+    gantt['end_s'] = gantt['end_ms'] / 1000
+    gantt['duration_s'] = (gantt['end_s'] - gantt['start_s']).round(2)
+    gantt['lane'] = 'Lane ' + (gantt['lane'] + 1).astype(str)
+    gantt['critical'] = gantt['scenario_run_id'].isin(critical_ids)
+    gantt_chart = alt.Chart(gantt).mark_bar(cornerRadius=2).encode(
+        x=alt.X('start_s:Q', title='Seconds since run start'),
+        x2='end_s:Q',
+        y=alt.Y('lane:N', title=None),
+        color=alt.Color('status:N', scale=status_scale, title='Status'),
+        stroke=alt.condition('datum.critical', alt.value('#ffffff'), alt.value('#232526')),
+        tooltip=['feature_name', 'scenario_name', 'status', 'duration_s', 'start_s', 'end_s', 'critical'],
+    ).properties(height=max(120, 40 * run['lanes']))
+    st.altair_chart(gantt_chart, width='stretch')
+
+    profile = pd.DataFrame(timeline['parallelism'])
+    profile['t_s'] = profile['t_ms'] / 1000
+    parallelism_chart = alt.Chart(profile).mark_area(interpolate='step-after', opacity=0.5, color='#A5D6FF').encode(
+        x=alt.X('t_s:Q', title='Seconds since run start'),
+        y=alt.Y('active:Q', title='Running scenarios'),
+    ).properties(height=140)
+    st.altair_chart(parallelism_chart, width='stretch')
+
+    with st.expander("Critical path (longest scenarios first)", expanded=False):
+        critical = pd.DataFrame(timeline['critical_path'])
+        critical['duration_s'] = (critical['duration_ms'] / 1000).round(2)
+        critical['wait_before_s'] = (critical['wait_before_ms'] / 1000).round(2)
+        st.dataframe(
+            critical.sort_values('duration_s', ascending=False)[['feature_name', 'scenario_name', 'duration_s', 'wait_before_s']],
+            height=300,
+        )
+
+
+# --- DURATION REGRESSIONS (from Scripts/detect_regressions.py) ---
+regressions = cached('load_regressions', report_data.REGRESSIONS_CSV)
+if not regressions.empty:
+    import altair as alt
+    st.subheader(":blue[Duration Regressions]")
+    r1, r2, r3 = st.columns(3)
+    r1.metric("Slower Scenarios", len(regressions))
+    r2.metric("High Severity", int((regressions['severity'] == 'high').sum()))
+    r3.metric("Added Time", f"{regressions['delta_ms'].sum() / 1000:.1f} s")
+    regressions['label'] = regressions['feature_name'].astype(str) + " | " + regressions['scenario_name'].astype(str)
+    regression_chart = alt.Chart(regressions.head(15)).mark_bar().encode(
+        x=alt.X('pct_change:Q', title='Slower than baseline median (%)'),
+        y=alt.Y('label:N', sort='-x', title=None),
+        color=alt.Color('severity:N', scale=alt.Scale(domain=['high', 'medium', 'low'], range=['#ff4040', '#FFD740', '#A5D6FF']), title='Severity'),
+        tooltip=['label', 'current_ms', 'baseline_median_ms', 'baseline_p95_ms', 'delta_ms', 'pct_change', 'robust_z', 'history_runs'],
+    )
+    st.altair_chart(regression_chart, width='stretch')
+    with st.expander("All regressions", expanded=False):
+        st.dataframe(regressions.drop(columns=['label']), height=300)
+
 
 # Table
 st.subheader("Scenario Details")
@@ -464,6 +535,22 @@ if row:
     st.markdown(f"**Duration (ms):** {details['step_duration_ms']}")
     st.markdown("**Steps:**")
     st.code(details['steps'])
+    step_spans = cached('load_step_spans', report_data.TIMELINE_STEPS_CSV) if timeline.get('scenarios') else pd.DataFrame()
+    if not step_spans.empty:
+        step_spans = step_spans[step_spans['scenario_run_id'] == details['scenario_run_id']].copy()
+        if not step_spans.empty:
+            step_spans['start_s'] = step_spans['start_ms'] / 1000
+            step_spans['end_s'] = step_spans['end_ms'] / 1000
+            step_spans['order'] = range(len(step_spans))
+            step_spans['step'] = [f"{i + 1}. {text}" for i, text in enumerate(step_spans['step'])]
+            st.markdown("**Step Timeline:**")
+            st.altair_chart(alt.Chart(step_spans).mark_bar().encode(
+                x=alt.X('start_s:Q', title='Seconds since run start', scale=alt.Scale(zero=False)),
+                x2='end_s:Q',
+                y=alt.Y('step:N', sort=alt.EncodingSortField('order'), title=None),
+                color=alt.Color('status:N', scale=status_scale, title='Status'),
+                tooltip=['step', 'status', 'start_s', 'end_s'],
+            ), width='stretch')
     if details['step_status'] != 'PASSED':
         if details['error_message']:
             st.markdown("**Error Message:**")
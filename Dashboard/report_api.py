@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+report_api.py
+
+Usage:
+  python report_api.py [--results-dir Results] [--host 127.0.0.1] [--port 8502]
+
+Read-only JSON API over the parsed results, built on the same loading and
+aggregation code as dashboard.py (report_data.py).
+
+  GET /api/summary                     headline numbers of the AI Overview
+  GET /api/features                    per-feature scenario/failure counts and defect density
+  GET /api/failures                    non-passed scenarios; query: feature, status, cause
+                                       (substring of the likely cause), page, page_size
+  GET /api/scenarios/<scenario_run_id> one scenario with steps, error and AI solution
+
+Responses are built once per results version and kept in memory; the CSV is
+re-read when its mtime or size changes. Every response carries an ETag and
+a matching If-None-Match (weak comparison, lists and * accepted) is answered
+with an empty 304.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from report_data import PARSED_CSV, RESULTS_DIR, feature_defect_stats, likely_cause, load_data, overview_stats
+
+FAILURE_FIELDS = ['feature_name', 'scenario_name', 'scenario_run_id', 'step_status', 'step_duration_ms', 'error_message', 'likely_cause']
+MAX_PAGE_SIZE = 500
+
+
+def _records(df):
+    """DataFrame rows as plain JSON-ready dicts (NaN becomes null)."""
+    return json.loads(df.to_json(orient='records'))
+
+
+def _feature_summary(row):
+    if row is None:
+        return None
+    return {
+        'feature_name': row['feature_name'],
+        'total_scenarios': int(row['total_scenarios']),
+        'failed_scenarios': int(row['failed_scenarios']),
+        'defect_density_pct': float(row['defect_density_pct']),
+    }
+
+
+class Response:
+    __slots__ = ('status', 'body', 'etag')
+
+    def __init__(self, status, payload):
+        self.status = status
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match list (or *) against our ETag."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class ReportSnapshot:
+    """Everything served for one version of the parsed CSV."""
+
+    def __init__(self, df, cache_size):
+        overview = overview_stats(df) if not df.empty else None
+        if overview:
+            summary = {
+                'total': int(overview['total']),
+                'passed': int(overview['passed']),
+                'failed': int(overview['failed']),
+                'pending': int(overview['pending']),
+                'skipped': int(overview['skipped']),
+                'fail_pct': round(float(overview['fail_pct']), 2),
+                'unique_features': int(overview['unique_features']),
+                'most_tested_feature': _feature_summary(overview['most_scenarios_feature']),
+                'most_failed_feature': _feature_summary(overview['most_failed_feature']),
+                'top_defect_density_feature': _feature_summary(overview['top_feature']),
+                'top_cause': overview['top_cause'],
+                'avg_duration_ms': round(float(overview['avg_duration']), 2),
+                'max_duration_ms': round(float(overview['max_duration']), 2),
+                'ai_suggestion_pct': round(float(overview['ai_suggestion_pct']), 2),
+            }
+            features = feature_defect_stats(df).sort_values('defect_density', ascending=False)
+            failures = df[df['step_status'] != 'PASSED'].copy()
+            failures['likely_cause'] = failures['ai_solution'].map(lambda ai: likely_cause(ai) if isinstance(ai, str) else None)
+            failures['status_upper'] = failures['step_status'].str.upper()
+            failures['cause_lower'] = failures['likely_cause'].fillna('').str.lower()
+        else:
+            summary = {'total': 0}
+            features = failures = None
+        self.summary = Response(200, summary)
+        self.features = Response(200, {'features': _records(features.drop(columns=['defect_density'])) if features is not None else []})
+        self.failures = failures
+        self.scenarios = {r['scenario_run_id']: r for r in _records(df)} if not df.empty else {}
+        self._scenario_responses = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def scenario(self, run_id):
+        response = self._scenario_responses.get(run_id)
+        if response is None:
+            row = self.scenarios.get(run_id)
+            if row is None:
+                return Response(404, {'error': f'unknown scenario_run_id {run_id}'})
+            response = self._scenario_responses[run_id] = Response(200, row)
+        return response
+
+    def failures_page(self, feature=None, status=None, cause=None, page=1, page_size=50):
+        key = (feature, status, cause, page, page_size)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+        rows = self.failures
+        if rows is None:
+            payload = {'page': page, 'page_size': page_size, 'total': 0, 'items': []}
+        else:
+            mask = rows['step_status'].notna()
+            if feature:
+                mask &= rows['feature_name'] == feature
+            if status:
+                mask &= rows['status_upper'] == status.upper()
+            if cause:
+                mask &= rows['cause_lower'].str.contains(cause.lower(), regex=False)
+            matched = rows[mask]
+            start = (page - 1) * page_size
+            payload = {
+                'page': page,
+                'page_size': page_size,
+                'total': int(len(matched)),
+                'items': _records(matched.iloc[start:start + page_size][FAILURE_FIELDS]),
+            }
+        response = Response(200, payload)
+        with self._lock:
+            self._cache[key] = response
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+
+class ReportStore:
+    """Holds the current snapshot and swaps it when the CSV changes."""
+
+    def __init__(self, results_dir, check_interval=1.0, cache_size=2048):
+        self.results_dir = Path(results_dir)
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self._version = None
+        self._checked_at = 0.0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < self.check_interval:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or now - self._checked_at >= self.check_interval:
+                try:
+                    st = (self.results_dir / PARSED_CSV).stat()
+                    version = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    version = None
+                if self._snapshot is None or version != self._version:
+                    self._snapshot = ReportSnapshot(load_data(self.results_dir), self.cache_size)
+                    self._version = version
+                self._checked_at = now
+        return self._snapshot
+
+    def route(self, raw_path):
+        parts = urlsplit(raw_path)
+        path = parts.path.rstrip('/')
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        snap = self.snapshot()
+        if path == '/api/summary':
+            return snap.summary
+        if path == '/api/features':
+            return snap.features
+        if path == '/api/failures':
+            try:
+                page = max(1, int(query.get('page', 1)))
+                page_size = min(MAX_PAGE_SIZE, max(1, int(query.get('page_size', 50))))
+            except ValueError:
+                return Response(400, {'error': 'page and page_size must be integers'})
+            return snap.failures_page(query.get('feature'), query.get('status'), query.get('cause'), page, page_size)
+        if path.startswith('/api/scenarios/'):
+            return snap.scenario(unquote(path[len('/api/scenarios/'):]))
+        return Response(404, {'error': 'not found'})
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # keep-alive response waits on the client's delayed ACK.
+    disable_nagle_algorithm = True
+    store = None
+
+    def do_GET(self):
+        response = self.store.route(self.path)
+        if response.status == 200 and etag_matches(self.headers.get('If-None-Match'), response.etag):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(response.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response.body)))
+        if response.status == 200:
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Read-only JSON API over parsed Cucumber results")
+    ap.add_argument('--results-dir', type=Path, default=RESULTS_DIR)
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8502)
+    args = ap.parse_args()
+
+    ReportHandler.store = ReportStore(args.results_dir)
+    ReportHandler.store.snapshot()
+    server = ThreadingHTTPServer((args.host, args.port), ReportHandler)
+    server.daemon_threads = True
+    print(f"Report API on http://{args.host}:{args.port}/api/summary (results: {args.results_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
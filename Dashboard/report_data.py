@@ -0,0 +1,112 @@
+"""
+report_data.py
+
+Loading and aggregation of parsed results, shared by dashboard.py and the
+JSON query API (report_api.py) so both report the same numbers.
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+RESULTS_DIR = Path(os.environ.get("RESULTS_DIR", r"c:/Users/yashg1/Desktop/Demoprep/Vertexone/Results"))
+PARSED_CSV = "parsed_report.csv"
+REGRESSIONS_CSV = "parsed_report_regressions.csv"
+DIFF_CSV = "parsed_report_diff.csv"
+TIMELINE_JSON = "parsed_report_timeline.json"
+TIMELINE_STEPS_CSV = "parsed_report_timeline_steps.csv"
+
+_CAUSE_RE = re.compile(r"Likely Cause:\n([\s\S]*?)Fix Steps:")
+
+
+def _read_results_csv(name, results_dir=None):
+    """A CSV from the results folder, or an empty frame when it is missing or unreadable."""
+    try:
+        return pd.read_csv(Path(results_dir or RESULTS_DIR) / name)
+    except Exception:
+        return pd.DataFrame()
+
+# Upload or load CSV
+def load_data(results_dir=None):
+    return _read_results_csv(PARSED_CSV, results_dir)
+
+def load_regressions(results_dir=None):
+    return _read_results_csv(REGRESSIONS_CSV, results_dir)
+
+def load_diff(results_dir=None):
+    return _read_results_csv(DIFF_CSV, results_dir)
+
+def load_timeline(results_dir=None):
+    try:
+        return json.loads((Path(results_dir or RESULTS_DIR) / TIMELINE_JSON).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def load_step_spans(results_dir=None):
+    return _read_results_csv(TIMELINE_STEPS_CSV, results_dir)
+
+def file_version(filename, results_dir=None):
+    """(mtime, size) of a results file, or None; changes whenever it is rewritten."""
+    try:
+        st = (Path(results_dir or RESULTS_DIR) / filename).stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def likely_cause(ai_solution):
+    """The 'Likely Cause' section of an AI Solution, or None."""
+    match = _CAUSE_RE.search(str(ai_solution))
+    return match.group(1).strip() if match else None
+
+
+def feature_defect_stats(df):
+    """Scenario and failure counts plus defect density per feature."""
+    stats = df.groupby('feature_name').agg(
+        total_scenarios = ('scenario_name', 'count'),
+        failed_scenarios = ('step_status', lambda x: (x == 'FAILED').sum())
+    ).reset_index()
+    stats['defect_density'] = stats['failed_scenarios'] / stats['total_scenarios']
+    stats['defect_density_pct'] = (stats['defect_density'] * 100).round(2)
+    return stats
+
+
+def overview_stats(df):
+    """Headline numbers behind the dashboard's AI Overview card."""
+    total = len(df)
+    passed = (df['step_status'] == 'PASSED').sum()
+    failed = (df['step_status'] == 'FAILED').sum()
+    feature_stats = feature_defect_stats(df)
+    causes = [c for c in (likely_cause(ai) for ai in df[df['step_status'] == 'FAILED']['ai_solution'].dropna()) if c]
+    cause_counts = Counter(causes)
+    if 'step_duration_ms' in df.columns and not df['step_duration_ms'].isnull().all():
+        avg_duration = df['step_duration_ms'].mean()
+        max_duration = df['step_duration_ms'].max()
+    else:
+        avg_duration = 0
+        max_duration = 0
+    if 'ai_solution' in df.columns and not df['ai_solution'].isnull().all():
+        ai_suggestion_pct = (df['ai_solution'].notna().sum() / total * 100) if total else 0
+    else:
+        ai_suggestion_pct = 0
+    return {
+        'total': total,
+        'passed': passed,
+        'failed': failed,
+        'pending': (df['step_status'].str.upper() == 'PENDING').sum(),
+        'skipped': (df['step_status'].str.upper() == 'SKIPPED').sum(),
+        'fail_pct': (failed / total * 100) if total else 0,
+        'unique_features': df['feature_name'].nunique(),
+        'top_feature': feature_stats.sort_values('defect_density', ascending=False).iloc[0] if not feature_stats.empty else None,
+        'most_scenarios_feature': feature_stats.sort_values('total_scenarios', ascending=False).iloc[0] if not feature_stats.empty else None,
+        'most_failed_feature': feature_stats.sort_values('failed_scenarios', ascending=False).iloc[0] if not feature_stats.empty else None,
+        'cause_counts': cause_counts,
+        'top_cause': cause_counts.most_common(1)[0][0] if cause_counts else "N/A",
+        'avg_duration': avg_duration,
+        'max_duration': max_duration,
+        'ai_suggestion_pct': ai_suggestion_pct,
+    }
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+detect_regressions.py
+
+Usage:
+  python detect_regressions.py current.csv history1.csv [history2.csv ...] [--output regressions.csv]
+
+Compares each scenario's duration in a freshly parsed run against its rolling
+history in earlier parsed outputs (oldest first) and flags significant
+slowdowns. Baselines are robust so a few slow nights do not move them: the
+median, the scaled median absolute deviation (MAD) and the p95 of the last
+--window passing runs, all computed with one groupby across every scenario.
+
+A scenario is flagged when, against at least --min-runs prior runs, its
+duration is more than --z robust z-scores above the median, above the
+baseline p95, and slower by both --min-pct percent and --min-ms.
+Only PASSED runs are compared; failed runs usually stop early.
+
+The output defaults to <current>_regressions.csv, which the dashboard reads.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_KEY = ['feature_name', 'scenario_name']
+MAD_SCALE = 1.4826  # makes MAD comparable to a standard deviation for normal data
+
+
+def load_durations(paths):
+    frames = []
+    for run_idx, path in enumerate(paths):
+        df = pd.read_csv(path, usecols=SCENARIO_KEY + ['step_status', 'step_duration_ms'])
+        df = df[df['step_status'] == 'PASSED']
+        # Scenario outlines repeat a name within one run; keep one value per run.
+        df = df.groupby(SCENARIO_KEY, dropna=False, as_index=False)['step_duration_ms'].median()
+        df['run_idx'] = run_idx
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=SCENARIO_KEY + ['step_duration_ms', 'run_idx'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def baseline_stats(history, window):
+    """Median, scaled MAD, p95 and run count per scenario over the last `window` runs."""
+    recent = history.sort_values('run_idx').groupby(SCENARIO_KEY, dropna=False).tail(window)
+    grouped = recent.groupby(SCENARIO_KEY, dropna=False)['step_duration_ms']
+    stats = grouped.agg(baseline_median_ms='median', history_runs='count')
+    stats['baseline_p95_ms'] = grouped.quantile(0.95)
+    abs_dev = (recent['step_duration_ms'] - grouped.transform('median')).abs()
+    stats['baseline_mad_ms'] = abs_dev.groupby([recent[k] for k in SCENARIO_KEY], dropna=False).median() * MAD_SCALE
+    return stats.reset_index()
+
+
+def detect_regressions(current, history, window=20, min_runs=3, z=3.0, min_pct=20.0, min_ms=500.0):
+    merged = current.merge(baseline_stats(history, window), on=SCENARIO_KEY, how='inner')
+    merged = merged.rename(columns={'step_duration_ms': 'current_ms'})
+    merged['delta_ms'] = merged['current_ms'] - merged['baseline_median_ms']
+    merged['pct_change'] = merged['delta_ms'] / merged['baseline_median_ms'].replace(0, np.nan) * 100
+    # A perfectly stable history has MAD 0; fall back to 1% of the median so
+    # the z-score stays finite and the percentage/ms floors decide.
+    spread = merged['baseline_mad_ms'].where(merged['baseline_mad_ms'] > 0, merged['baseline_median_ms'] * 0.01)
+    merged['robust_z'] = merged['delta_ms'] / spread.replace(0, np.nan)
+    flagged = merged[
+        (merged['history_runs'] >= min_runs)
+        & (merged['robust_z'] > z)
+        & (merged['current_ms'] > merged['baseline_p95_ms'])
+        & (merged['pct_change'] >= min_pct)
+        & (merged['delta_ms'] >= min_ms)
+    ].copy()
+    flagged['severity'] = np.select(
+        [flagged['pct_change'] >= 100, flagged['pct_change'] >= 50],
+        ['high', 'medium'],
+        default='low',
+    )
+    columns = SCENARIO_KEY + [
+        'current_ms', 'baseline_median_ms', 'baseline_p95_ms', 'baseline_mad_ms',
+        'delta_ms', 'pct_change', 'robust_z', 'history_runs', 'severity',
+    ]
+    return flagged.sort_values('delta_ms', ascending=False)[columns].round(2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Flag scenario duration regressions against prior parsed runs")
+    ap.add_argument('current', type=Path, help="parsed CSV of the new run")
+    ap.add_argument('history', type=Path, nargs='+', help="parsed CSVs of earlier runs, oldest first")
+    ap.add_argument('--output', type=Path, help="defaults to <current>_regressions.csv")
+    ap.add_argument('--window', type=int, default=20, help="prior runs per scenario in the baseline")
+    ap.add_argument('--min-runs', type=int, default=3, help="prior runs needed before a scenario is judged")
+    ap.add_argument('--z', type=float, default=3.0, help="robust z-score threshold")
+    ap.add_argument('--min-pct', type=float, default=20.0, help="minimum slowdown in percent")
+    ap.add_argument('--min-ms', type=float, default=500.0, help="minimum slowdown in milliseconds")
+    args = ap.parse_args()
+
+    current = load_durations([args.current]).drop(columns='run_idx')
+    history = load_durations(args.history)
+    regressions = detect_regressions(
+        current, history, window=args.window, min_runs=args.min_runs,
+        z=args.z, min_pct=args.min_pct, min_ms=args.min_ms,
+    )
+    output = args.output or args.current.with_name(args.current.stem + '_regressions.csv')
+    regressions.to_csv(output, index=False)
+    print(f"Compared {len(current)} scenarios against {len(args.history)} prior runs: "
+          f"{len(regressions)} regressions saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
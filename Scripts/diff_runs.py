@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+diff_runs.py
+
+Usage:
+  python diff_runs.py older.csv [...] previous.csv current.csv [--output diff.csv]
+
+Compares the scenario outcomes of the last two parsed runs and lists what
+changed: new failures, fixes, failures that persist, failures whose error
+signature changed, and scenarios that were added or removed. Earlier runs,
+when given, only feed failing_streak (consecutive failing runs up to now).
+
+Scenarios are matched on a stable key rather than the per-run
+scenario_run_id: the project-relative feature path, scenario name and the
+scenario's occurrence among same-named scenarios in that file, ordered by
+line. Outline rows stay distinct while edits that only shift line numbers
+or a different agent workspace do not break the match. When any run comes
+from an older CSV without feature_uri, every run is keyed on feature name
+instead, in report order. Keys and error signatures are 64-bit hashes
+computed column-wise, so runs are joined with an integer hash join and only
+the columns needed are read from each CSV.
+
+The output defaults to <current>_diff.csv (changed scenarios only), which the
+dashboard renders as its "What Changed" panel.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from feature_paths import DEFAULT_ANCHOR, runner_paths
+from insight_cache import normalize_error
+
+COLUMNS = ['feature_name', 'scenario_name', 'scenario_run_id', 'step_status', 'error_message', 'feature_uri', 'scenario_line']
+CATEGORY_ORDER = ['new_failure', 'changed_error', 'still_failing', 'fixed', 'added', 'removed']
+
+
+def error_signature(errors):
+    """Hash of the first line of normalize_error(), the insight cache's notion of "same error"."""
+    errors = errors.fillna('').astype(str)
+    unique = errors.unique()
+    first_line = errors.map(dict(zip(unique, (normalize_error(e).split('\n', 1)[0].strip() for e in unique))))
+    signature = pd.util.hash_pandas_object(first_line, index=False).to_numpy()
+    # Nullable so the signature survives the outer join without a float cast.
+    return pd.array(np.where(first_line == '', np.uint64(0), signature), dtype='UInt64')
+
+
+def load_run(path, anchor=DEFAULT_ANCHOR):
+    df = pd.read_csv(path, usecols=lambda c: c in COLUMNS)
+    for col in ('feature_uri', 'scenario_line'):
+        if col not in df.columns:
+            df[col] = pd.NA
+    df['feature_path'] = runner_paths(df['feature_uri'], anchor)
+    # Retries produce several runs of one scenario; the last attempt counts.
+    # Without a line, outline examples share a name and are all kept.
+    retried = df['scenario_line'].notna() & df.duplicated(['feature_path', 'scenario_name', 'scenario_line'], keep='last')
+    df = df[~retried].copy()
+    df['failed'] = df['step_status'] == 'FAILED'
+    df['error_signature'] = pd.array(np.zeros(len(df), dtype='uint64'), dtype='UInt64')
+    df.loc[df['failed'], 'error_signature'] = error_signature(df.loc[df['failed'], 'error_message'])
+    return df
+
+
+def key_runs(runs):
+    """Index every run on the stable scenario key (see module docstring)."""
+    by_path = all(run['feature_path'].notna().any() for run in runs)
+    keyed = []
+    for run in runs:
+        if by_path:
+            run = run.assign(feature_key=run['feature_path'].fillna(run['feature_name']))
+            run = run.sort_values(['feature_key', 'scenario_line'], kind='stable')
+        else:
+            run = run.assign(feature_key=run['feature_name'])
+        run['occurrence'] = run.groupby(['feature_key', 'scenario_name'], dropna=False).cumcount()
+        key = pd.util.hash_pandas_object(run[['feature_key', 'scenario_name', 'occurrence']], index=False).to_numpy()
+        keyed.append(run.set_index(pd.Index(key, name='scenario_key')))
+    return keyed
+
+
+def diff_runs(runs):
+    previous, current = runs[-2], runs[-1]
+    joined = current.join(previous[['step_status', 'failed', 'error_signature']], how='outer', rsuffix='_prev')
+    # Names and locations of removed scenarios come from the previous run.
+    for col in ('feature_name', 'scenario_name', 'feature_path', 'scenario_line', 'error_message'):
+        joined[col] = joined[col].fillna(previous[col].reindex(joined.index))
+
+    in_cur = joined['step_status'].notna()
+    in_prev = joined['step_status_prev'].notna()
+    failed = joined['failed'].fillna(False).astype(bool)
+    failed_prev = joined['failed_prev'].fillna(False).astype(bool)
+    same_signature = (joined['error_signature'] == joined['error_signature_prev']).fillna(False).astype(bool)
+    joined['category'] = np.select(
+        [
+            in_cur & ~in_prev,
+            ~in_cur & in_prev,
+            failed & ~failed_prev,
+            ~failed & failed_prev,
+            failed & failed_prev & ~same_signature,
+            failed & failed_prev,
+        ],
+        ['added', 'removed', 'new_failure', 'fixed', 'changed_error', 'still_failing'],
+        default='unchanged',
+    )
+
+    # Consecutive failing runs ending at the current one, across every run given.
+    failing = np.column_stack([
+        run['failed'].reindex(joined.index, fill_value=False).to_numpy(dtype=bool) for run in runs
+    ])
+    joined['failing_streak'] = np.cumprod(failing[:, ::-1], axis=1).sum(axis=1)
+
+    changed = joined[joined['category'] != 'unchanged'].copy()
+    changed['category'] = pd.Categorical(changed['category'], CATEGORY_ORDER, ordered=True)
+    changed['scenario_line'] = changed['scenario_line'].astype('Int64')
+    changed['error_first_line'] = changed['error_message'].fillna('').astype(str).str.split('\n', n=1).str[0].str.slice(0, 200)
+    changed = changed.rename(columns={
+        'step_status': 'current_status',
+        'step_status_prev': 'previous_status',
+        'error_signature': 'current_error_signature',
+        'error_signature_prev': 'previous_error_signature',
+        'scenario_run_id': 'current_scenario_run_id',
+    })
+    for col in ('current_error_signature', 'previous_error_signature'):
+        # astype(object) keeps exact uint64 values; Series.map on UInt64 with NA goes through float.
+        changed[col] = [f'{int(v):016x}' if pd.notna(v) and v else '' for v in changed[col].astype(object)]
+    columns = [
+        'category', 'feature_name', 'scenario_name', 'feature_path', 'scenario_line',
+        'previous_status', 'current_status', 'previous_error_signature', 'current_error_signature',
+        'failing_streak', 'current_scenario_run_id', 'error_first_line',
+    ]
+    return changed.sort_values(['category', 'feature_name', 'scenario_line'])[columns], joined['category'].value_counts()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Diff scenario outcomes between parsed runs")
+    ap.add_argument('runs', type=Path, nargs='+', help="parsed CSVs, oldest first; the last two are compared")
+    ap.add_argument('--output', type=Path, help="defaults to <current>_diff.csv")
+    ap.add_argument('--anchor', default=DEFAULT_ANCHOR, help="feature paths are compared from this segment on")
+    args = ap.parse_args()
+    if len(args.runs) < 2:
+        ap.error("need at least two parsed runs")
+
+    runs = key_runs([load_run(path, args.anchor) for path in args.runs])
+    changed, counts = diff_runs(runs)
+    output = args.output or args.runs[-1].with_name(args.runs[-1].stem + '_diff.csv')
+    changed.to_csv(output, index=False)
+    summary = ', '.join(f"{int(counts.get(c, 0))} {c.replace('_', ' ')}" for c in CATEGORY_ORDER)
+    print(f"{summary}; {int(counts.get('unchanged', 0))} unchanged. Saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+feature_paths.py
+
+Project-relative feature file paths from the feature_uri column of parsed
+CSVs. Cucumber reports absolute, machine-specific URIs
+(file:///C:/Users/.../src/test/resources/features/Login.feature), so runs
+from different agents or workspaces only line up once the prefix before the
+anchor directory is dropped.
+"""
+
+import re
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_ANCHOR = 'src/test/resources/'
+
+
+def runner_path(uri, anchor=DEFAULT_ANCHOR):
+    """Turn a report URI into a path the runner can resolve from the project root."""
+    if not isinstance(uri, str) or not uri:
+        return None
+    path = unquote(urlsplit(uri).path) if uri.startswith('file:') else uri
+    path = path.replace('\\', '/')
+    if anchor and anchor in path:
+        return path[path.index(anchor):]
+    return path.lstrip('/') if re.match(r'^/[A-Za-z]:/', path) else path
+
+
+def runner_paths(uris, anchor=DEFAULT_ANCHOR):
+    """runner_path() over a Series of URIs, computed once per distinct URI."""
+    unique = uris.dropna().unique()
+    return uris.map(dict(zip(unique, (runner_path(u, anchor) for u in unique))))
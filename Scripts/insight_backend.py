@@ -0,0 +1,182 @@
+"""
+insight_backend.py
+
+Model backend for the "AI Solution" column.
+
+A backend is any object with
+  version                    string that namespaces its answers in the insight cache
+  async generate_batch(items) one str (or None for "use the rules") per item
+HttpInsightBackend is the only one; without INSIGHT_BACKEND_URL the parser
+calls the rule table directly and caches under RULES_BACKEND_VERSION.
+
+The parser submits each failed scenario as soon as its testCaseFinished
+message is seen; an asyncio loop on a background thread groups the
+submissions into batches, keeps at most INSIGHT_CONCURRENCY requests in
+flight and falls back to the rule engine when a batch errors or times out.
+
+Environment:
+  INSIGHT_BACKEND_URL   POST endpoint of a model server, e.g.
+                        http://127.0.0.1:8765/v1/insights (unset: rules only)
+  INSIGHT_BATCH_SIZE    failures per request (default 16)
+  INSIGHT_CONCURRENCY   maximum requests in flight (default 4)
+  INSIGHT_TIMEOUT_S     per-request timeout in seconds (default 10)
+  INSIGHT_MODEL_VERSION bump to invalidate cached answers from the endpoint
+
+Wire format (see insight_stub_server.py):
+  request   {"items": [{"id", "scenario_name", "error_message", "steps"}]}
+  response  {"insights": [{"id", "ai_solution"}]}
+"""
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from insight_rules import RULES_VERSION, generate_ai_solution
+
+
+RULES_BACKEND_VERSION = f'rules:{RULES_VERSION}'
+
+
+class HttpInsightBackend:
+    """Posts batches as JSON to a model server over plain asyncio streams."""
+
+    def __init__(self, url, model_version=''):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported insight backend URL: {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.ssl = parts.scheme == 'https'
+        self.version = f'http:{url}:{model_version}'
+
+    async def generate_batch(self, items):
+        body = json.dumps({'items': items}).encode('utf-8')
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        try:
+            head = (
+                f"POST {self.path} HTTP/1.0\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        header_blob, _, payload = raw.partition(b'\r\n\r\n')
+        status_line = header_blob.split(b'\r\n', 1)[0].decode('latin-1')
+        status = int(status_line.split()[1]) if len(status_line.split()) > 1 else 0
+        if status != 200:
+            raise RuntimeError(f"Insight backend returned '{status_line}'")
+        by_id = {r['id']: r.get('ai_solution') for r in json.loads(payload)['insights']}
+        return [by_id.get(it['id']) for it in items]
+
+
+class InsightClient:
+    """Batches failures onto a backend from a background asyncio loop.
+
+    submit() is thread-safe and returns a concurrent.futures.Future holding
+    the insight text; close() waits for every outstanding batch. Ids answered
+    by the rule fallback are recorded in fallback_ids so they are not cached
+    as backend answers.
+    """
+
+    def __init__(self, backend, batch_size=16, max_concurrency=4, timeout=10.0, linger=0.05):
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.linger = linger
+        self.stats = {'submitted': 0, 'batches': 0, 'fallback_batches': 0, 'fallback_items': 0}
+        self.fallback_ids = set()
+        self._pending = []
+        self._inflight = set()
+        self._linger_handle = None
+        self._sem = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='insight-client', daemon=True)
+        self._thread.start()
+
+    def submit(self, item_id, scenario_name, error_message, steps):
+        fut = Future()
+        item = {
+            'id': item_id,
+            'scenario_name': scenario_name,
+            'error_message': error_message,
+            'steps': list(steps),
+        }
+        self._loop.call_soon_threadsafe(self._enqueue, item, fut)
+        return fut
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    # --- loop-thread only below ---
+    def _enqueue(self, item, fut):
+        self.stats['submitted'] += 1
+        self._pending.append((item, fut))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._linger_handle is None:
+            self._linger_handle = self._loop.call_later(self.linger, self._flush)
+
+    def _flush(self):
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        items = [item for item, _ in batch]
+        async with self._sem:
+            self.stats['batches'] += 1
+            try:
+                results = await asyncio.wait_for(self.backend.generate_batch(items), self.timeout)
+            except Exception:
+                self.stats['fallback_batches'] += 1
+                results = [None] * len(items)
+        if len(results) != len(items):
+            results = [None] * len(items)
+        for (item, fut), result in zip(batch, results):
+            # Anything but text (missing id, dict, number...) gets the rule answer.
+            if not isinstance(result, str):
+                self.stats['fallback_items'] += 1
+                self.fallback_ids.add(item['id'])
+                result = generate_ai_solution(item['scenario_name'], item['error_message'], item['steps'])
+            fut.set_result(result)
+
+    async def _drain(self):
+        self._flush()
+        while self._inflight:
+            await asyncio.gather(*list(self._inflight))
+
+
+def client_from_env():
+    """Build an InsightClient from INSIGHT_* variables, or None for rules only."""
+    url = os.environ.get('INSIGHT_BACKEND_URL')
+    if not url:
+        return None
+    return InsightClient(
+        HttpInsightBackend(url, os.environ.get('INSIGHT_MODEL_VERSION', '')),
+        batch_size=int(os.environ.get('INSIGHT_BATCH_SIZE', 16)),
+        max_concurrency=int(os.environ.get('INSIGHT_CONCURRENCY', 4)),
+        timeout=float(os.environ.get('INSIGHT_TIMEOUT_S', 10)),
+    )
@@ -0,0 +1,151 @@
+"""
+insight_cache.py
+
+On-disk cache of "AI Solution" text for failed scenarios.
+
+The same failure recurs across many nightly runs, so each insight is stored
+in SQLite under a hash of the backend version and the masked inputs the
+generator actually looks at (scenario name, error text, first two steps).
+The error text is first reduced by normalize_error() so workspace paths,
+line numbers, session ids and timestamps that differ between agents and
+runs do not split one failure into many keys.
+Recency is tracked per entry and the least recently used entries are evicted
+once the cache grows past its size bound.
+
+Environment:
+  INSIGHT_CACHE_PATH         SQLite file (default ~/.cache/aidemo/insight_cache.sqlite,
+                             "off" keeps the cache in memory for this run only)
+  INSIGHT_CACHE_MAX_ENTRIES  size bound for LRU eviction (default 50000)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'aidemo' / 'insight_cache.sqlite'
+
+_STACK_FRAME = re.compile(r'^\s+at\s')
+# Selenium appends environment dumps (host, driver, capabilities, session) to its errors.
+_ENV_LINE = re.compile(r'^\s*(Build info|System info|Driver info|Capabilities|Session ID|For documentation)\b')
+_VOLATILE = [
+    (re.compile(r'(?:file:/+(?:[A-Za-z]:/)?|\b[A-Za-z]:[\\/]|(?<![\w.:/])/)(?:[^\s:()\\/\'"]+[\\/])+'), ''),  # directories, keep the file name
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'), '<time>'),
+    (re.compile(r'\b[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\b'), '<id>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b'), '<id>'),
+    (re.compile(r'(\.\w+):\d+\b'), r'\1:#'),  # Foo.java:91, login.feature:33
+]
+
+
+def normalize_error(error_message):
+    """Error text with run-specific tokens removed, for keying and generating.
+
+    Keeps the message lines and the first stack frame, drops later frames and
+    Selenium's environment lines, strips directories from paths and replaces
+    source line numbers, timestamps and hex/UUID ids with placeholders.
+    """
+    if not error_message:
+        return error_message
+    lines = []
+    seen_frame = False
+    for line in str(error_message).split('\n'):
+        if _STACK_FRAME.match(line):
+            if seen_frame:
+                continue
+            seen_frame = True
+        elif _ENV_LINE.match(line):
+            continue
+        for pattern, repl in _VOLATILE:
+            line = pattern.sub(repl, line)
+        lines.append(line.rstrip())
+    return '\n'.join(lines).strip()
+
+
+def insight_key(version, scenario_name, error_message, steps):
+    """Hash the generator inputs (already masked, error through normalize_error)."""
+    steps_preview = list(steps[:2]) if isinstance(steps, list) else str(steps).split('\n')[:2]
+    blob = json.dumps([version, scenario_name or '', error_message or '', steps_preview])
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class InsightCache:
+    """SQLite-backed LRU map from insight_key() to insight text.
+
+    Lookups hit the database directly; recency updates and new entries are
+    buffered and written in one transaction by close().
+    """
+
+    def __init__(self, path, max_entries=50000):
+        self.path = str(path)
+        self.max_entries = max(1, max_entries)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS insights ("
+            " key TEXT PRIMARY KEY, ai_solution TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS insights_last_used ON insights(last_used)")
+        self._touched = set()
+        self._new = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def get(self, key):
+        value = self._new.get(key)
+        if value is None:
+            row = self._conn.execute("SELECT ai_solution FROM insights WHERE key = ?", (key,)).fetchone()
+            value = row[0] if row else None
+        if value is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+            self._touched.add(key)
+        return value
+
+    def put(self, key, value):
+        self._new[key] = value
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+
+    def close(self):
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE insights SET last_used = ? WHERE key = ?",
+                ((now, k) for k in self._touched if k not in self._new),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO insights (key, ai_solution, last_used) VALUES (?, ?, ?)",
+                ((k, v, now) for k, v in self._new.items()),
+            )
+            self.stats['stored'] += len(self._new)
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM insights WHERE key IN "
+                    "(SELECT key FROM insights ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats['evicted'] += overflow
+        self._touched.clear()
+        self._new.clear()
+        self._conn.close()
+
+    def summary(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / lookups * 100 if lookups else 0.0
+        return (
+            f"Insight cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+            f"({rate:.1f}% hit rate), {self.stats['stored']} stored, {self.stats['evicted']} evicted"
+        )
+
+
+def cache_from_env():
+    path = os.environ.get('INSIGHT_CACHE_PATH') or DEFAULT_CACHE_PATH
+    if str(path).lower() == 'off':
+        path = ':memory:'
+    return InsightCache(path, int(os.environ.get('INSIGHT_CACHE_MAX_ENTRIES', 50000)))
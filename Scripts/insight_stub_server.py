@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+insight_stub_server.py
+
+Usage:
+  python insight_stub_server.py [--port 8765] [--latency-ms 250] [--error-rate 0.0]
+
+Local stand-in for a model endpoint, used to develop and load-test the
+insight backend offline. It answers POST /v1/insights with the rule engine's
+output after a simulated model latency, and fails a configurable share of
+requests with HTTP 503 to exercise the parser's rule fallback.
+
+  INSIGHT_BACKEND_URL=http://127.0.0.1:8765/v1/insights \\
+      python parse_cucumber_html.py report.html output.csv
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from insight_rules import generate_ai_solution
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_s = 0.25
+    error_rate = 0.0
+    counters = {'requests': 0, 'items': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            with self.lock:
+                self._send_json(200, dict(self.counters))
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/v1/insights':
+            self._send_json(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        items = json.loads(self.rfile.read(length) or b'{}').get('items', [])
+        time.sleep(self.latency_s)
+        fail = random.random() < self.error_rate
+        with self.lock:
+            self.counters['requests'] += 1
+            self.counters['items'] += len(items)
+            self.counters['errors'] += int(fail)
+        if fail:
+            self._send_json(503, {'error': 'simulated model overload'})
+            return
+        insights = [
+            {
+                'id': it['id'],
+                'ai_solution': generate_ai_solution(it.get('scenario_name'), it.get('error_message'), it.get('steps', [])),
+            }
+            for it in items
+        ]
+        self._send_json(200, {'insights': insights})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stand-in model server for the insight backend")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--latency-ms', type=float, default=250, help="simulated model latency per request")
+    ap.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered with HTTP 503")
+    args = ap.parse_args()
+
+    StubHandler.latency_s = args.latency_ms / 1000
+    StubHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Insight stub listening on http://{args.host}:{args.port}/v1/insights")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,14 +7,25 @@ Usage:
 
 Parses a Cucumber HTML report and outputs a flat CSV containing
 Feature, Scenario, Steps, Status, Duration, Error message and placeholders for AI Solution.
+An execution timeline (scenario spans, worker lanes, parallelism and the
+critical path) is written next to it as <output>_timeline.json, and the
+per-step spans as <output>_timeline_steps.csv.
 """
 
 import json
 import re
 import sys
+from sys import intern
 from pathlib import Path
 import pandas as pd
 
+from concurrent.futures import Future
+
+from insight_backend import RULES_BACKEND_VERSION, client_from_env
+from insight_cache import cache_from_env, insight_key, normalize_error
+from insight_rules import generate_ai_solution, mask_sensitive
+from timeline import TimelineRecorder
+
 if len(sys.argv) < 3:
     print("Usage: python parse_cucumber_html.py input.html output.csv")
     sys.exit(1)
@@ -22,314 +33,297 @@ if len(sys.argv) < 3:
 input_html = Path(sys.argv[1])
 output_csv = Path(sys.argv[2])
 
-html_text = input_html.read_text(encoding='utf-8')
-
-# 1. Extract CUCUMBER_MESSAGES JSON array
-pattern = re.compile(r'CUCUMBER_MESSAGES\s*=\s*(\[[\s\S]*?\]);', re.MULTILINE)
-match = pattern.search(html_text)
-if not match:
-    raise RuntimeError("Could not find CUCUMBER_MESSAGES array in HTML")
-messages = json.loads(match.group(1))
-
-# 2. Build maps
-features_map = {}        # feature_uri -> {feature_name, description, tags}
-scenarios_map = {}       # testCaseId -> scenario info
-steps_text_map = {}      # step_id -> text/keyword
-
-scenario_runs = []       # testCaseStarted info
-steps_rows = []          # final rows for CSV
 
-# 3. First pass: get feature and scenario definitions
-for msg in messages:
-    if 'gherkinDocument' in msg:
-        g = msg['gherkinDocument']
-        if 'feature' in g:
-            feat_name = g['feature'].get('name')
-            feat_desc = g['feature'].get('description')
-            feat_tags = [t['name'] for t in g['feature'].get('tags', [])]
-            features_map[g.get('uri')] = {
-                'feature_name': feat_name,
-                'description': feat_desc,
-                'tags': feat_tags,
-                'scenarios': {}
-            }
-            # Steps text map for reference
-            for child in g['feature'].get('children', []):
-                if 'scenario' in child:
-                    scen = child['scenario']
-                    scenario_id = scen.get('id') or scen.get('name')
-                    features_map[g.get('uri')]['scenarios'][scenario_id] = {
-                        'scenario_name': scen.get('name'),
-                        'tags': [t['name'] for t in scen.get('tags', [])],
-                        'steps': scen.get('steps', [])
-                    }
-                    for st in scen.get('steps', []):
-                        step_id = st.get('id') or (scenario_id + "_" + st.get('text'))
-                        steps_text_map[step_id] = {
-                            'text': st.get('text'),
-                            'keyword': st.get('keyword')
-                        }
+# 1. Stream the CUCUMBER_MESSAGES JSON array.
+# The file is read in chunks and each array element is decoded on its own,
+# so neither the whole HTML nor the whole message list is held in memory.
+MESSAGES_START = re.compile(r'CUCUMBER_MESSAGES\s*=\s*\[')
+
+def iter_messages(path, chunk_size=1 << 20):
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as fh:
+        buf = ''
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                raise RuntimeError("Could not find CUCUMBER_MESSAGES array in HTML")
+            buf += chunk
+            match = MESSAGES_START.search(buf)
+            if match:
+                buf = buf[match.end():]
+                break
+            buf = buf[-256:]  # the marker may straddle two chunks
+        pos = 0
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    raise RuntimeError("Unterminated CUCUMBER_MESSAGES array in HTML")
+                chunk = fh.read(chunk_size)
+                eof = not chunk
+                buf, pos = chunk, 0
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                msg, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element cut off at the end of the buffer: read more and retry.
+                if eof:
+                    raise
+                chunk = fh.read(max(chunk_size, len(buf) - pos))
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield msg
+            pos = end
+            if pos > chunk_size:
+                buf, pos = buf[pos:], 0
 
 
-
-# 4. Map testCaseId to scenario and feature using testCase and pickle
-testCaseId_to_names = {}  # testCaseId -> (feature_name, scenario_name)
-pickleId_to_pickle = {}   # pickleId -> pickle
-for msg in messages:
-    if 'pickle' in msg:
-        pickle = msg['pickle']
-        pickleId_to_pickle[pickle['id']] = pickle
-
-for msg in messages:
-    if 'testCase' in msg:
-        testCase = msg['testCase']
-        testCaseId = testCase['id']
-        pickleId = testCase['pickleId']
-        pickle = pickleId_to_pickle.get(pickleId)
-        if pickle:
-            scenario_name = pickle.get('name')
-            uri = pickle.get('uri')
-            feature = features_map.get(uri, {})
-            feature_name = feature.get('feature_name')
-            testCaseId_to_names[testCaseId] = (feature_name, scenario_name)
-
-# 5. Capture testCaseStarted for scenario runs
-testCaseStarted_by_id = {}
-for msg in messages:
-    if 'testCaseStarted' in msg:
-        tcs = msg['testCaseStarted']
-        testCaseStarted_by_id[tcs['id']] = tcs
-
-# 6. Step events
-step_started_times = {}
-for msg in messages:
-    if 'testStepStarted' in msg:
-        tss = msg['testStepStarted']
-        step_started_times[tss['testStepId']] = tss['timestamp']
-
-
-
-
-
-# 7. Collect steps from scenario definition and errors from execution
-scenario_steps = {}  # scenario_run_id -> {feature_name, scenario_name, steps: [], status, duration, error_message}
-step_keywords = {'when', 'then', 'and', 'but'}
+# 2. Build maps
+feature_names = {}       # feature_uri -> feature_name
+ast_node_lines = {}      # scenario / examples row id -> line in the feature file
+pickle_info = {}         # pickleId -> (scenario_name, feature_uri, last astNodeId)
+testCase_info = {}       # testCaseId -> (feature_name, scenario_name, pickleId, feature_uri, scenario_line)
 scenario_run_to_testCaseId = {}
-for msg in messages:
-    if 'testCaseStarted' in msg:
-        tcs = msg['testCaseStarted']
-        scenario_run_to_testCaseId[tcs['id']] = tcs.get('testCaseId')
-
-
 
-
-# First, collect all scenario steps from the feature/scenario definition using testCase -> pickleId -> pickle
-pickleId_to_steps = {}  # pickleId -> [step text]
-for msg in messages:
-    if 'pickle' in msg:
-        pickle = msg['pickle']
-        steps = []
-        for step in pickle.get('steps', []):
-            keyword = (step.get('keyword', '') or '').strip()
-            text = (step.get('text', '') or '').strip()
-            # Join keyword and text, even if no space
-            if keyword and text:
-                steps.append(f"{keyword}{text}")
-            elif keyword:
-                steps.append(keyword)
-            elif text:
-                steps.append(text)
-        pickleId_to_steps[pickle['id']] = steps
-
-testCaseId_to_pickleId = {}
-for msg in messages:
-    if 'testCase' in msg:
-        testCase = msg['testCase']
-        testCaseId = testCase['id']
-        pickleId = testCase['pickleId']
-        testCaseId_to_pickleId[testCaseId] = pickleId
-
-# Now, collect execution results and errors
-for msg in messages:
+scenario_runs = {}       # scenario_run_id -> ScenarioRun
+
+
+def record_gherkin_document(g):
+    """Feature name plus the lines of scenarios and examples rows."""
+    if 'feature' not in g:
+        return
+    feature_names[g.get('uri')] = g['feature'].get('name')
+    for child in g['feature'].get('children', []):
+        # Scenarios nested in a Rule are recorded like top-level ones
+        nested = [rule_child.get('scenario') for rule_child in child.get('rule', {}).get('children', [])]
+        for scen in [child.get('scenario')] + nested:
+            if not scen:
+                continue
+            ast_node_lines[scen.get('id')] = scen.get('location', {}).get('line')
+            for ex in scen.get('examples', []):
+                for row in ex.get('tableBody', []):
+                    ast_node_lines[row.get('id')] = row.get('location', {}).get('line')
+
+
+# 3. Compact per-run record. Names, uris and statuses are interned and the
+# step text lives once per pickle, so a run only holds its own counters and
+# error messages (collected in a list, joined and masked once by finish()).
+class ScenarioRun:
+    __slots__ = ('feature_name', 'scenario_name', 'scenario_run_id', 'pickle_id', 'step_status',
+                 'step_duration_ms', 'errors', 'error_message', 'feature_uri', 'scenario_line')
+
+    def __init__(self, feature_name, scenario_name, scenario_run_id, pickle_id, feature_uri, scenario_line):
+        self.feature_name = feature_name
+        self.scenario_name = scenario_name
+        self.scenario_run_id = scenario_run_id
+        self.pickle_id = pickle_id
+        self.step_status = 'PASSED'
+        self.step_duration_ms = 0.0
+        self.errors = None
+        self.error_message = None
+        self.feature_uri = feature_uri
+        self.scenario_line = scenario_line
+
+    def finish(self):
+        """Masked error text, built from the collected errors on first call."""
+        if self.error_message is None:
+            self.error_message = mask_sensitive('\n'.join(self.errors)) if self.errors else ''
+            self.errors = None
+        return self.error_message
+
+
+# 4. Masked scenario name, masked steps and their joined text per pickle,
+# computed when the pickle is seen and shared by every run of it.
+pickle_text = {}  # pickleId -> (scenario_name, [step], steps_text)
+
+def record_pickle(pickle):
+    steps = []
+    for step in pickle.get('steps', []):
+        keyword = (step.get('keyword', '') or '').strip()
+        text = (step.get('text', '') or '').strip()
+        # Join keyword and text, even if no space
+        if keyword and text:
+            steps.append(f"{keyword}{text}")
+        elif keyword:
+            steps.append(keyword)
+        elif text:
+            steps.append(text)
+    steps = [intern(mask_sensitive(st)) for st in steps]
+    scenario_name = intern(pickle.get('name') or '')
+    pickle_text[pickle['id']] = (mask_sensitive(scenario_name), steps, '\n'.join(steps))
+    # The last AST node is the examples row for outlines, else the scenario
+    ast_ids = pickle.get('astNodeIds') or [None]
+    pickle_info[pickle['id']] = (scenario_name, intern(pickle.get('uri') or ''), ast_ids[-1])
+
+def masked_pickle_text(pickle_id, scenario_name):
+    cached = pickle_text.get(pickle_id)
+    if cached is None:
+        return (mask_sensitive(scenario_name), [], '')
+    return cached
+
+def record_test_case(testCase):
+    info = pickle_info.get(testCase['pickleId'])
+    if info:
+        scenario_name, uri, ast_id = info
+        feature_name = feature_names.get(uri)
+        feature_name = intern(feature_name) if feature_name is not None else None
+        testCase_info[testCase['id']] = (feature_name, scenario_name, testCase['pickleId'], uri, ast_node_lines.get(ast_id))
+    else:
+        testCase_info[testCase['id']] = (None, None, testCase['pickleId'], None, None)
+
+
+# 5. Single pass over the messages. Cucumber emits documents and pickles
+# before test cases, and test cases before their runs, so every lookup below
+# is satisfied by messages already seen. The timeline recorder keeps its own
+# timestamps from the same pass.
+# With INSIGHT_BACKEND_URL set, each failed scenario is handed to the insight
+# backend as soon as it finishes so model round-trips overlap with parsing.
+# Answers already in the insight cache are never sent, and a key already
+# submitted in this run reuses its pending Future, so model calls grow with
+# distinct errors rather than failures. Keys and generation use the
+# normalized error so reruns on other agents hit the same entries.
+insight_client = client_from_env()
+insight_cache = cache_from_env()
+insight_version = insight_client.backend.version if insight_client else RULES_BACKEND_VERSION
+insight_keys = {}     # scenario_run_id -> cache key
+insight_results = {}  # scenario_run_id -> cached str or Future[str]
+insight_pending = {}  # cache key -> (scenario_run_id that submitted it, Future[str])
+timeline_recorder = TimelineRecorder()
+for msg in iter_messages(input_html):
+    timeline_recorder.record(msg)
     if 'testStepFinished' in msg:
         tsf = msg['testStepFinished']
         result = tsf['testStepResult']
         scenario_run_id = tsf['testCaseStartedId']
-        testCaseId = scenario_run_to_testCaseId.get(scenario_run_id)
-        # Map to names
-        scenario_name = None
-        feature_name = None
-        if testCaseId:
-            names = testCaseId_to_names.get(testCaseId)
-            if names:
-                feature_name, scenario_name = names
-        if scenario_run_id not in scenario_steps:
-            steps = []
-            if testCaseId:
-                pickleId = testCaseId_to_pickleId.get(testCaseId)
-                if pickleId:
-                    steps = pickleId_to_steps.get(pickleId, [])
-            scenario_steps[scenario_run_id] = {
-                'feature_name': feature_name,
-                'scenario_name': scenario_name,
-                'scenario_run_id': scenario_run_id,
-                'steps': steps,
-                'step_status': 'PASSED',
-                'step_duration_ms': 0.0,
-                'error_message': '',
-                'ai_solution': None
-            }
+        run = scenario_runs.get(scenario_run_id)
+        if run is None:
+            testCaseId = scenario_run_to_testCaseId.get(scenario_run_id)
+            feature_name, scenario_name, pickleId, feature_uri, scenario_line = testCase_info.get(
+                testCaseId, (None, None, None, None, None)
+            )
+            run = scenario_runs[scenario_run_id] = ScenarioRun(
+                feature_name, scenario_name, scenario_run_id, pickleId, feature_uri, scenario_line
+            )
         # Accumulate duration
         dur = result.get('duration', {})
         seconds = dur.get('seconds', 0)
         nanos = dur.get('nanos', 0)
-        scenario_steps[scenario_run_id]['step_duration_ms'] += seconds * 1000 + nanos / 1e6
+        run.step_duration_ms += seconds * 1000 + nanos / 1e6
         # If any step failed, set error and status (append error if multiple)
         if result.get('status') != 'PASSED':
-            scenario_steps[scenario_run_id]['step_status'] = result.get('status')
+            run.step_status = intern(result.get('status') or '')
             err_msg = result.get('message')
             if err_msg:
-                if scenario_steps[scenario_run_id]['error_message']:
-                    scenario_steps[scenario_run_id]['error_message'] += '\n' + err_msg
+                if run.errors is None:
+                    run.errors = [err_msg]
                 else:
-                    scenario_steps[scenario_run_id]['error_message'] = err_msg
-
-
-
-# Senior QA AI insight generator for failed scenarios
-def mask_sensitive(text):
-    if not text:
-        return text
-    # Mask patterns like username: ..., password: ..., user=..., pass=..., etc.
-    patterns = [
-        r'(username\s*[:=]\s*)([^\s\n]+)',
-        r'(password\s*[:=]\s*)([^\s\n]+)',
-        r'(user\s*[:=]\s*)([^\s\n]+)',
-        r'(pass\s*[:=]\s*)([^\s\n]+)',
-        r'(uname\s*[:=]\s*)([^\s\n]+)',
-        r'(pwd\s*[:=]\s*)([^\s\n]+)',
-        r'(login as\s+)([^\s\n]+)',
-        r'(credentials\s*[:=]\s*)([^\s\n]+)',
-        # Also mask steps like: User enters username "..."
-        r'(User enters username ")([^"]+)(")',
-        r'(User enters password ")([^"]+)(")',
-        r'(User enters user ")([^"]+)(")',
-        r'(User enters pass ")([^"]+)(")',
-    ]
-    for pat in patterns:
-        # For patterns with three groups, replace group 2 with XXXXX
-        if 'User enters' in pat:
-            text = re.sub(pat, r'\1XXXXX\3', text, flags=re.IGNORECASE)
-        else:
-            text = re.sub(pat, r'\1XXXXX', text, flags=re.IGNORECASE)
-    return text
-
-def generate_ai_solution(scenario_name, error_message, steps):
-    scenario_name = mask_sensitive(scenario_name)
-    error_message = mask_sensitive(error_message)
-    steps = [mask_sensitive(s) for s in steps] if isinstance(steps, list) else mask_sensitive(steps)
-    steps_preview = steps[:2] if isinstance(steps, list) else str(steps).split('\n')[:2]
-    if not error_message or not str(error_message).strip():
-        return ""
-    scenario = scenario_name.lower() if scenario_name else ""
-    em = error_message.lower() if error_message else ""
-    steps_preview = steps[:2] if isinstance(steps, list) else str(steps).split('\n')[:2]
-    if not error_message or not str(error_message).strip():
-        return ""
-    scenario = scenario_name.lower() if scenario_name else ""
-    em = error_message.lower() if error_message else ""
-
-
-    # Expanded pattern list for robust QA coverage (now matches scenario name as well)
-    patterns = [
-        # Login and authentication
-        (r'login with valid credentials containing special characters', "The application may not support special characters in credentials, causing login to fail.", ["Confirm requirements for allowed characters.", "Update backend validation and test data.", "Add user feedback for unsupported characters."], ["Ensures login works for all valid credential types.", "Improves user experience and reduces login issues."]),
-        (r'login with valid long username and password', "The application may have length restrictions on username or password fields.", ["Check application and database field length limits.", "Update test data to match allowed lengths.", "Add validation and user feedback for excessive input."], ["Prevents user confusion and ensures only valid data is submitted.", "Reduces login failures due to input length."]),
-        (r'login with empty username', "The application did not display the required error message for a missing username.", ["Ensure frontend validation is implemented for empty username fields.", "Add backend validation as a fallback.", "Update test to check for correct error message."], ["Improves user guidance and reduces login errors.", "Ensures compliance with UX standards."]),
-        (r'login with valid username and empty password', "The application did not display the required error message for a missing password.", ["Ensure frontend validation is implemented for empty password fields.", "Add backend validation as a fallback.", "Update test to check for correct error message."], ["Improves user guidance and reduces login errors.", "Ensures compliance with UX standards."]),
-        (r'login with both fields empty', "The application did not display the required error message for missing username and password.", ["Ensure frontend validation is implemented for both fields.", "Add backend validation as a fallback.", "Update test to check for correct error message."], ["Improves user guidance and reduces login errors.", "Ensures compliance with UX standards."]),
-        (r'verify show password option', "The Show Password feature may not be implemented or is malfunctioning.", ["Verify the Show Password button triggers the correct UI event.", "Check for JavaScript errors or missing event handlers.", "Ensure password field type toggles between 'password' and 'text'."], ["Improves usability for users entering complex passwords.", "Reduces login errors due to mistyped passwords."]),
-        (r'verify login button is disabled', "The Login button is not properly disabled when required fields are empty.", ["Add frontend validation to disable the button when fields are blank.", "Add backend validation to reject empty submissions.", "Update test to verify button state."], ["Prevents invalid login attempts.", "Improves user experience and reduces server load."]),
-        (r'verify error message disappears', "The error message is not cleared after correcting credentials.", ["Ensure error messages are reset on input change or new login attempt.", "Update frontend logic to clear errors on valid input.", "Add test to verify error message disappears."], ["Improves user feedback and reduces confusion.", "Ensures error states do not persist incorrectly."]),
-        (r'verify login form alignment', "The login form CSS or layout is incorrect, causing misalignment.", ["Review and update CSS for form alignment.", "Use layout tools (e.g., flexbox, grid) for consistent alignment.", "Add UI tests to catch alignment issues early."], ["Improves visual quality and user trust.", "Ensures accessibility and usability."]),
-        # API, backend, and integration
-        (r'api error|http 4\d\d|http 5\d\d|internal server error|service unavailable|bad gateway|502|503|504', "API/backend service returned an error.", ["Check backend service health and logs.", "Validate request payloads and endpoints.", "Add retry logic or fallback handling."], ["Improves system resilience.", "Reduces downtime impact."]),
-        (r'invalid token|token expired|jwt expired|unauthorized|forbidden', "Authentication token is invalid or expired.", ["Check token generation and expiry policies.", "Ensure token is refreshed as needed.", "Update test to handle token renewal."], ["Prevents auth failures.", "Improves session management."]),
-        (r'connection refused|connection reset|network error|timeout|timed out|dns error|host unreachable', "Network connectivity issue or service timeout.", ["Check network connection and endpoints.", "Increase timeout settings if appropriate.", "Retry operation or add error handling."], ["Improves reliability in unstable network conditions.", "Reduces test flakiness."]),
-        (r'database error|sql error|db connection|constraint failed|deadlock|primary key|foreign key|unique constraint', "Database operation failed.", ["Check database connectivity and credentials.", "Review query logic and constraints.", "Resolve deadlocks or data conflicts."], ["Ensures data integrity.", "Reduces backend failures."]),
-        (r'element not found|no such element|unable to locate|selector not found|stale element|element is not attached', "UI element was not found or became stale during test execution.", ["Check if the element selector is correct and stable.", "Ensure the UI has loaded before interacting.", "Update test to wait for element visibility or stability."], ["Reduces UI test flakiness.", "Improves test reliability."]),
-        (r'assertion failed|expected .* but found|does not match|mismatch|assertEquals|assertTrue|assertFalse', "Test assertion did not match expected result.", ["Review test expectations and actual results.", "Update test or application logic as needed.", "Add clearer error messages for mismatches."], ["Improves test accuracy.", "Helps quickly identify root cause."]),
-        (r'invalid input|validation failed|missing required|invalid format|data not found|required field|empty field|blank|input error', "Input data is missing or does not meet validation rules.", ["Review test data for required fields and formats.", "Update validation logic as needed.", "Add user feedback for invalid input."], ["Prevents data corruption.", "Improves user guidance and data quality."]),
-        (r'file not found|cannot open file|resource missing|no such file|file missing|file not accessible', "File or resource required for the test is missing.", ["Check file paths and resource availability.", "Update test data setup.", "Add error handling for missing files."], ["Prevents test failures due to missing resources.", "Improves test setup robustness."]),
-        (r'date mismatch|timezone error|invalid date|time drift|date format|date parse', "Date/time value is invalid or mismatched.", ["Check date/time formats and timezones.", "Synchronize clocks if needed.", "Update test data for valid date ranges."], ["Prevents time-based test failures.", "Improves data consistency."]),
-        (r'session expired|state not saved|lost session|token expired|session timeout', "Session or state was lost or expired during test.", ["Increase session timeout if appropriate.", "Ensure state is saved between steps.", "Add re-authentication logic if needed."], ["Reduces session-related test failures.", "Improves user experience."]),
-        (r'browser crashed|driver error|automation failed|webdriver|chrome not reachable|browser not reachable', "Browser or automation driver failed during test.", ["Update browser/driver versions.", "Check for compatibility issues.", "Add error handling for driver failures."], ["Improves automation stability.", "Reduces test interruptions."]),
-        (r'permission denied|access denied|not authorized|forbidden|insufficient privileges', "User does not have the required permissions or role.", ["Check user roles and permissions.", "Update access control policies if needed.", "Add test coverage for permission boundaries."], ["Ensures only authorized users can access sensitive features.", "Reduces security risks."]),
-        (r'intermittent|flaky|sometimes fails|race condition|sporadic|random failure', "Test is flaky or affected by timing/race conditions.", ["Add waits or synchronization in test.", "Stabilize environment and data setup.", "Log and monitor flaky test runs."], ["Improves test reliability.", "Reduces false negatives."]),
-        (r'environment variable|config not set|missing configuration|env error|config missing|env not set', "Environment or configuration variable is missing or incorrect.", ["Check environment variable values.", "Update configuration files as needed.", "Add validation for required config at startup."], ["Prevents environment-specific failures.", "Improves deployment reliability."]),
-        (r'out of memory|memory leak|heap space|stack overflow', "Application ran out of memory or has a memory leak.", ["Profile memory usage.", "Optimize memory-intensive operations.", "Increase memory allocation if needed."], ["Prevents crashes.", "Improves performance."]),
-        (r'null pointer|type error|undefined is not a function|cannot read property', "Code error: null pointer or type error.", ["Check for null/undefined before accessing properties.", "Add error handling for missing objects.", "Update code to prevent type errors."], ["Prevents runtime errors.", "Improves code robustness."]),
-        (r'build failed|compilation error|syntax error|parse error', "Build or compilation failed due to syntax or parse error.", ["Check code syntax.", "Fix parse errors.", "Update build scripts as needed."], ["Prevents build failures.", "Improves developer productivity."]),
-        (r'not implemented|todo|pending implementation', "Feature or step is not yet implemented.", ["Implement the missing feature or step.", "Update test to reflect implemented functionality.", "Remove or skip test if not needed."], ["Ensures test coverage is accurate.", "Prevents false failures."]),
-        (r'test data not found|missing test data|test data error', "Test data is missing or incorrect.", ["Check test data setup.", "Update test data files.", "Add validation for required test data."], ["Prevents test failures due to missing data.", "Improves test reliability."]),
-        (r'email not received|email failed|smtp error|mailbox unavailable', "Email notification failed.", ["Check SMTP server configuration.", "Check spam/junk folder.", "Update email sending logic as needed."], ["Ensures notifications are delivered.", "Improves user communication."]),
-        (r'payment failed|transaction declined|card error|insufficient funds', "Payment or transaction failed.", ["Check payment gateway logs.", "Validate card details and funds.", "Update error handling for payment failures."], ["Prevents revenue loss.", "Improves user experience."]),
-        (r'access violation|segmentation fault|core dumped', "Critical runtime error: access violation or segmentation fault.", ["Check for invalid memory access.", "Update code to prevent out-of-bounds access.", "Add error handling for critical failures."], ["Prevents crashes.", "Improves application stability."]),
-        (r'performance degraded|slow response|timeout|latency', "Performance issue: slow response or timeout.", ["Profile application performance.", "Optimize slow operations.", "Increase timeout thresholds if needed."], ["Improves user experience.", "Reduces timeouts."]),
-        (r'circular dependency|dependency error|module not found', "Dependency or module error.", ["Check dependency installation.", "Update module paths.", "Fix circular dependencies."], ["Prevents runtime errors.", "Improves build reliability."]),
-        (r'permission error|file permission|access is denied', "File or resource permission error.", ["Check file and directory permissions.", "Update access rights as needed.", "Add error handling for permission issues."], ["Prevents access errors.", "Improves security."]),
-        (r'api limit|rate limit|too many requests|quota exceeded', "API rate limit or quota exceeded.", ["Reduce request frequency.", "Implement exponential backoff.", "Monitor API usage and quotas."], ["Prevents service disruption.", "Improves reliability."]),
-        (r'captcha required|captcha failed|robot check', "CAPTCHA or bot check failed.", ["Update test to handle CAPTCHA.", "Request manual intervention if needed.", "Contact support for test bypass."], ["Prevents automation blockages.", "Improves test automation coverage."]),
-        (r'license expired|license not found|activation failed', "License or activation error.", ["Check license validity.", "Update license files.", "Contact vendor for support."], ["Prevents service disruption.", "Ensures compliance."]),
-        (r'feature flag|flag not enabled|feature not available', "Feature flag or toggle is not enabled.", ["Enable the required feature flag.", "Update test to check flag status.", "Coordinate with product team for rollout."], ["Ensures correct feature availability.", "Prevents false failures."]),
-        (r'api deprecated|deprecated endpoint|obsolete api', "API endpoint is deprecated or obsolete.", ["Update to use supported API endpoints.", "Coordinate with API provider for migration.", "Update documentation and tests."], ["Prevents future failures.", "Ensures compatibility."]),
-        (r'overflow|underflow|divide by zero', "Mathematical error: overflow, underflow, or divide by zero.", ["Check calculations for edge cases.", "Add error handling for math errors.", "Update test data to avoid invalid operations."], ["Prevents runtime errors.", "Improves calculation reliability."]),
-        (r'ui not responsive|unresponsive|ui freeze|ui hang', "UI became unresponsive or froze during test.", ["Profile UI performance.", "Optimize rendering logic.", "Add monitoring for UI hangs."], ["Improves user experience.", "Prevents UI freezes."]),
-        (r'api schema mismatch|contract violation|unexpected response', "API response schema mismatch or contract violation.", ["Update API contract tests.", "Coordinate with backend team for schema changes.", "Update client code for new schema."], ["Prevents integration failures.", "Ensures contract compliance."]),
-        (r'csrf token|cross-site request forgery|csrf error', "CSRF token or security error.", ["Check CSRF token handling.", "Update security configuration.", "Add test for CSRF protection."], ["Prevents security vulnerabilities.", "Improves application safety."]),
-        (r'xpath error|invalid xpath|xpath not found', "XPath selector error.", ["Check XPath expressions.", "Update selectors for UI changes.", "Add error handling for invalid XPath."], ["Prevents selector failures.", "Improves UI test reliability."]),
-        (r'api timeout|gateway timeout|upstream timeout', "API or gateway timeout.", ["Check upstream service health.", "Increase timeout thresholds.", "Add retry logic for timeouts."], ["Prevents service disruption.", "Improves reliability."]),
-    ]
-
-    # Try to match scenario name, error message, and steps for patterns
-    context_blob = f"{scenario}\n{em}\n" + '\n'.join(steps_preview)
-    for pat, cause, fix_steps, benefits in patterns:
-        if re.search(pat, context_blob):
-            return (
-                f"Likely Cause:\n  - {cause}\n"
-                f"Fix Steps:\n  " + '\n  '.join(f"{i+1}. {step}" for i, step in enumerate(fix_steps)) + "\n"
-                f"Benefits:\n  - " + '\n  - '.join(benefits)
-            )
-
-    # Generic fallback: context-aware expert QA insight
-    return (
-        f"Likely Cause:\n  - Test failed for scenario: '{scenario_name}'. Error: {error_message[:120]}...\n"
-        "Fix Steps:\n  1. Review the failed step(s):\n     " + '\n     '.join(steps_preview) + "\n  2. Analyze the error message and logs for root cause.\n  3. Collaborate with developers to resolve the defect.\n  4. Update the test or application as needed.\n"
-        "Benefits:\n  - Drives continuous improvement and transparency for all stakeholders.\n  - Reduces recurrence of similar issues in the future."
-    )
-
-
-# Mask sensitive info in all relevant fields before saving
-steps_rows = []
-for run in scenario_steps.values():
-    scenario_name = mask_sensitive(run['scenario_name'])
-    error_message = mask_sensitive(run['error_message'])
-    steps = [mask_sensitive(s) for s in run['steps']]
+                    run.errors.append(err_msg)
+    elif 'testCaseFinished' in msg:
+        scenario_run_id = msg['testCaseFinished']['testCaseStartedId']
+        run = scenario_runs.get(scenario_run_id)
+        if run:
+            error_message = run.finish()
+            if insight_client and run.step_status == 'FAILED':
+                scenario_name, steps, _ = masked_pickle_text(run.pickle_id, run.scenario_name)
+                error_signature = normalize_error(error_message)
+                key = insight_key(insight_version, scenario_name, error_signature, steps)
+                insight_keys[scenario_run_id] = key
+                pending = insight_pending.get(key)
+                cached = insight_cache.get(key) if pending is None else None
+                if pending is not None:
+                    # Counted like a lookup of an answer already buffered for this run.
+                    insight_cache.stats['hits'] += 1
+                    insight_results[scenario_run_id] = pending[1]
+                elif cached is not None:
+                    insight_results[scenario_run_id] = cached
+                else:
+                    future = insight_client.submit(scenario_run_id, scenario_name, error_signature, steps)
+                    insight_pending[key] = (scenario_run_id, future)
+                    insight_results[scenario_run_id] = future
+    elif 'testCaseStarted' in msg:
+        tcs = msg['testCaseStarted']
+        scenario_run_to_testCaseId[tcs['id']] = tcs.get('testCaseId')
+    elif 'testCase' in msg:
+        record_test_case(msg['testCase'])
+    elif 'pickle' in msg:
+        record_pickle(msg['pickle'])
+    elif 'gherkinDocument' in msg:
+        record_gherkin_document(msg['gherkinDocument'])
+# Lookup maps are only needed while streaming; free them before the output.
+for lookup in (pickle_info, testCase_info, scenario_run_to_testCaseId, ast_node_lines):
+    lookup.clear()
+
+
+# Mask sensitive info in all relevant fields before saving.
+# Rows are built straight into column lists; steps text is shared per pickle.
+# Output columns: feature_name, scenario_name, scenario_run_id, steps, step_status, step_duration_ms, error_message, ai_solution,
+# feature_uri, scenario_line
+columns = {name: [] for name in (
+    'feature_name', 'scenario_name', 'scenario_run_id', 'steps', 'step_status', 'step_duration_ms',
+    'error_message', 'ai_solution', 'feature_uri', 'scenario_line',
+)}
+for run in scenario_runs.values():
+    scenario_name, steps, steps_text = masked_pickle_text(run.pickle_id, run.scenario_name)
+    error_message = run.finish()
     ai_solution = ''
-    if run['step_status'] == 'FAILED':
-        ai_solution = generate_ai_solution(scenario_name, error_message, steps)
-    steps_rows.append({
-        'feature_name': run['feature_name'],
-        'scenario_name': scenario_name,
-        'scenario_run_id': run['scenario_run_id'],
-        'steps': '\n'.join(steps),
-        'step_status': run['step_status'],
-        'step_duration_ms': run['step_duration_ms'],
-        'error_message': error_message,
-        'ai_solution': ai_solution
-    })
-
-# Output columns: feature_name, scenario_name, scenario_run_id, steps, step_status, step_duration_ms, error_message, ai_solution
-df = pd.DataFrame(steps_rows)
+    if run.step_status == 'FAILED':
+        scenario_run_id = run.scenario_run_id
+        ai_solution = insight_results.get(scenario_run_id)
+        if isinstance(ai_solution, Future):
+            ai_solution = ai_solution.result()
+            key = insight_keys[scenario_run_id]
+            if insight_pending[key][0] not in insight_client.fallback_ids:
+                insight_cache.put(key, ai_solution)
+        elif ai_solution is None:
+            error_signature = normalize_error(error_message)
+            key = insight_key(insight_version, scenario_name, error_signature, steps)
+            ai_solution = insight_cache.get(key)
+            if ai_solution is None:
+                ai_solution = generate_ai_solution(scenario_name, error_signature, steps)
+                insight_cache.put(key, ai_solution)
+    columns['feature_name'].append(run.feature_name)
+    columns['scenario_name'].append(scenario_name)
+    columns['scenario_run_id'].append(run.scenario_run_id)
+    columns['steps'].append(steps_text)
+    columns['step_status'].append(run.step_status)
+    columns['step_duration_ms'].append(run.step_duration_ms)
+    columns['error_message'].append(error_message)
+    columns['ai_solution'].append(ai_solution)
+    columns['feature_uri'].append(run.feature_uri)
+    columns['scenario_line'].append(run.scenario_line)
+scenario_runs.clear()
+insight_results.clear()
+insight_pending.clear()
+
+df = pd.DataFrame(columns) if columns['scenario_run_id'] else pd.DataFrame()
+if not df.empty:
+    df['scenario_line'] = df['scenario_line'].astype('Int64')
 df.to_csv(output_csv, index=False)
 print(f"Saved parsed data to {output_csv}")
+del df
+
+timeline, step_spans = timeline_recorder.build(
+    dict(zip(columns['scenario_run_id'], zip(columns['feature_name'], columns['scenario_name']))),
+    dict(zip(columns['scenario_run_id'], columns['step_status'])),
+)
+del timeline_recorder, columns
+timeline_json = output_csv.with_name(output_csv.stem + '_timeline.json')
+timeline_json.write_text(json.dumps(timeline, separators=(',', ':')), encoding='utf-8')
+step_spans.to_csv(output_csv.with_name(output_csv.stem + '_timeline_steps.csv'), index=False)
+del step_spans
+if timeline['run']:
+    tr = timeline['run']
+    print(f"Saved timeline to {timeline_json} (wall {tr['wall_ms'] / 1000:.1f}s, "
+          f"{tr['lanes']} lanes, avg parallelism {tr['avg_parallelism']:.2f}, idle {tr['idle_ms'] / 1000:.1f}s)")
+if insight_client:
+    insight_client.close()
+    st = insight_client.stats
+    print(f"Insight backend: {st['submitted']} failures in {st['batches']} batches, "
+          f"{st['fallback_items']} answered by rule fallback")
+insight_cache.close()
+print(insight_cache.summary())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+plan_shards.py
+
+Usage:
+  python plan_shards.py --shards 4 run1.csv [run2.csv ...] [--suite suite.csv] [--by feature] [--out-dir Results/shards]
+
+Splits the Cucumber suite into N shards of similar predicted duration for
+parallel CI agents. Each scenario's estimate is the median of its passing
+durations across the given parsed runs (any status if it never passed);
+scenarios that appear only in --suite (for example a parsed --dry-run report)
+are estimated from their feature's median, then from the overall median.
+Scenarios, or whole features with --by feature, are packed with the
+longest-processing-time rule: largest first, each onto the lightest shard.
+
+Writes to --out-dir:
+  shard_01.txt ...   rerun-file lists ("path:line:line", or "path" per feature)
+                     accepted by Cucumber as @shard_01.txt
+  shard_plan.csv     every scenario with its shard and estimate
+and prints the predicted makespan of each shard.
+
+Feature URIs are reduced to project-relative paths (from --anchor on) before
+anything is keyed, so runs parsed on agents with different workspace paths
+describe the same scenarios. A scenario is identified by that path and its
+line; scenarios without a feature_uri (CSVs from older parser versions) fall
+back to feature and scenario name and are written as anchored name patterns
+to shard_01_names.txt for the runner's --name filter.
+"""
+
+import argparse
+import heapq
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from feature_paths import DEFAULT_ANCHOR, runner_paths
+
+SCENARIO_COLUMNS = ['scenario_key', 'feature_name', 'scenario_name', 'runner_path', 'scenario_line']
+
+
+def load_runs(paths, anchor=DEFAULT_ANCHOR):
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        for col in ('feature_uri', 'scenario_line'):
+            if col not in df.columns:
+                df[col] = pd.NA
+        df['runner_path'] = runner_paths(df['feature_uri'], anchor)
+        frames.append(df[SCENARIO_COLUMNS[1:] + ['step_status', 'step_duration_ms']])
+    runs = pd.concat(frames, ignore_index=True)
+    runs['scenario_line'] = runs['scenario_line'].astype('Int64')
+    # Rows from CSVs without locations borrow them from other runs when the
+    # feature/scenario name pair resolves to exactly one location.
+    located = runs[runs['runner_path'].notna()].drop_duplicates(SCENARIO_COLUMNS[1:])
+    unique = located[~located.duplicated(['feature_name', 'scenario_name'], keep=False)]
+    missing = runs['runner_path'].isna()
+    if missing.any() and not unique.empty:
+        filled = runs.loc[missing, ['feature_name', 'scenario_name']].merge(
+            unique[SCENARIO_COLUMNS[1:]], on=['feature_name', 'scenario_name'], how='left'
+        )
+        runs.loc[missing, 'runner_path'] = filled['runner_path'].to_numpy()
+        runs.loc[missing, 'scenario_line'] = filled['scenario_line'].to_numpy()
+    runs['scenario_key'] = scenario_keys(runs)
+    return runs
+
+
+def scenario_keys(runs):
+    """path:line where known, else path or feature name plus scenario name."""
+    names = runs['feature_name'].astype(str) + '|' + runs['scenario_name'].astype(str)
+    by_path = runs['runner_path'].astype(str) + '|' + runs['scenario_name'].astype(str)
+    by_line = runs['runner_path'].astype(str) + ':' + runs['scenario_line'].astype(str)
+    has_path = runs['runner_path'].notna()
+    return by_line.where(has_path & runs['scenario_line'].notna(), by_path.where(has_path, names))
+
+
+def estimate_durations(runs, suite=None):
+    """One row per scenario with estimated_ms and the estimate_source used."""
+    passed = runs[runs['step_status'] == 'PASSED'].groupby('scenario_key')['step_duration_ms'].median()
+    executed = runs[~runs['step_status'].isin(['SKIPPED', 'PENDING', 'UNDEFINED'])]
+    any_status = executed.groupby('scenario_key')['step_duration_ms'].median()
+
+    # Names of a location may differ between runs (a renamed scenario); the latest wins.
+    scenarios = runs[SCENARIO_COLUMNS]
+    if suite is not None:
+        scenarios = pd.concat([scenarios, suite[SCENARIO_COLUMNS]])
+    scenarios = scenarios.drop_duplicates('scenario_key', keep='last').set_index('scenario_key')
+
+    scenarios['estimated_ms'] = passed.reindex(scenarios.index)
+    scenarios['estimate_source'] = scenarios['estimated_ms'].notna().map({True: 'passed', False: None})
+    fill = any_status.reindex(scenarios.index)
+    use = scenarios['estimated_ms'].isna() & fill.notna()
+    scenarios.loc[use, 'estimated_ms'] = fill[use]
+    scenarios.loc[use, 'estimate_source'] = 'any_status'
+
+    scenarios = scenarios.reset_index()
+    feature = scenarios['runner_path'].fillna(scenarios['feature_name'])
+    known = scenarios['estimated_ms'].notna()
+    feature_median = feature.map(scenarios[known].groupby(feature[known])['estimated_ms'].median())
+    use = scenarios['estimated_ms'].isna() & feature_median.notna()
+    scenarios.loc[use, 'estimated_ms'] = feature_median[use]
+    scenarios.loc[use, 'estimate_source'] = 'feature_median'
+    use = scenarios['estimated_ms'].isna()
+    scenarios.loc[use, 'estimated_ms'] = scenarios.loc[known, 'estimated_ms'].median() if known.any() else 0.0
+    scenarios.loc[use, 'estimate_source'] = 'suite_median'
+    return scenarios
+
+
+def lpt_assign(weights, shards):
+    """Longest-processing-time packing; returns a shard index per weight and the shard loads."""
+    loads = [(0.0, i) for i in range(shards)]
+    heapq.heapify(loads)
+    assignment = [0] * len(weights)
+    totals = [0.0] * shards
+    for idx in sorted(range(len(weights)), key=lambda i: -weights[i]):
+        load, shard = heapq.heappop(loads)
+        assignment[idx] = shard
+        totals[shard] = load + weights[idx]
+        heapq.heappush(loads, (totals[shard], shard))
+    return assignment, totals
+
+
+def write_shards(plan, shards, out_dir, by_feature):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for shard in range(shards):
+        rows = plan[plan['shard'] == shard]
+        located = rows[rows['runner_path'].notna()]
+        lines = []
+        for path, group in located.groupby('runner_path', sort=True):
+            scenario_lines = group['scenario_line'].dropna().astype(int).sort_values().unique()
+            if by_feature or len(scenario_lines) == 0:
+                lines.append(path)
+            else:
+                lines.append(path + ''.join(f':{n}' for n in scenario_lines))
+        (out_dir / f'shard_{shard + 1:02d}.txt').write_text('\n'.join(lines) + ('\n' if lines else ''), encoding='utf-8')
+        unlocated = rows[rows['runner_path'].isna()]
+        names_file = out_dir / f'shard_{shard + 1:02d}_names.txt'
+        if not unlocated.empty:
+            names = sorted(set('^' + re.sub(r'([.^$*+?{}\[\]\\|()])', r'\\\1', str(n)) + '$' for n in unlocated['scenario_name']))
+            names_file.write_text('\n'.join(names) + '\n', encoding='utf-8')
+        elif names_file.exists():
+            names_file.unlink()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Plan duration-balanced test shards from parsed runs")
+    ap.add_argument('runs', type=Path, nargs='+', help="parsed CSVs with per-scenario durations")
+    ap.add_argument('--shards', type=int, required=True, help="number of parallel agents")
+    ap.add_argument('--suite', type=Path, help="parsed CSV listing every scenario to plan (e.g. from a dry run)")
+    ap.add_argument('--by', choices=['scenario', 'feature'], default='scenario', help="packing granularity")
+    ap.add_argument('--anchor', default=DEFAULT_ANCHOR, help="keep feature paths from this segment on")
+    ap.add_argument('--out-dir', type=Path, default=Path('Results/shards'))
+    args = ap.parse_args()
+    if args.shards < 1:
+        ap.error("--shards must be at least 1")
+
+    runs = load_runs(args.runs, args.anchor)
+    suite = load_runs([args.suite], args.anchor) if args.suite else None
+    plan = estimate_durations(runs, suite)
+
+    if args.by == 'feature':
+        unit = plan['runner_path'].fillna(plan['feature_name'].astype(str))
+        weights = plan.groupby(unit, sort=False)['estimated_ms'].sum()
+        assignment, totals = lpt_assign(weights.tolist(), args.shards)
+        plan['shard'] = unit.map(dict(zip(weights.index, assignment)))
+    else:
+        assignment, totals = lpt_assign(plan['estimated_ms'].tolist(), args.shards)
+        plan['shard'] = assignment
+
+    write_shards(plan, args.shards, args.out_dir, args.by == 'feature')
+    plan['shard'] = plan['shard'] + 1
+    plan.sort_values(['shard', 'feature_name', 'scenario_line']).to_csv(args.out_dir / 'shard_plan.csv', index=False)
+
+    counts = plan['shard'].value_counts()
+    for shard, total in enumerate(totals, start=1):
+        print(f"shard {shard:02d}: {int(counts.get(shard, 0)):4d} scenarios, predicted {total / 1000:8.1f} s")
+    estimated = plan['estimate_source'].isin(['feature_median', 'suite_median']).sum()
+    print(f"Makespan {max(totals) / 1000:.1f} s vs. {sum(totals) / 1000:.1f} s serial "
+          f"({estimated} scenarios estimated from medians); lists written to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
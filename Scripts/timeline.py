@@ -0,0 +1,249 @@
+"""
+timeline.py
+
+Builds an execution timeline from the Cucumber message stream: start/end of
+every scenario run and step, worker lanes, achieved parallelism over time,
+idle time and the chain of scenarios that set the run's wall-clock time.
+
+All times in the output are milliseconds since testRunStarted (or the first
+scenario start when the report has no testRunStarted message). Step spans
+are returned separately as a frame (STEP_COLUMNS) so the parser can write
+them to a columnar file instead of the timeline JSON.
+"""
+
+import heapq
+from array import array
+from sys import intern
+
+import pandas as pd
+
+from insight_rules import mask_sensitive
+
+STEP_COLUMNS = ['scenario_run_id', 'step', 'status', 'start_ms', 'end_ms']
+
+
+def timestamp_ms(ts):
+    if not ts:
+        return None
+    return round(ts.get('seconds', 0) * 1000 + ts.get('nanos', 0) / 1e6, 3)
+
+
+def assign_lanes(intervals):
+    """Greedy interval partitioning: reuse the lane that freed up earliest.
+
+    intervals is a list of (start, end) pairs; returns one lane index per
+    interval, using the minimum number of lanes that can hold them.
+    """
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    lanes = [0] * len(intervals)
+    free = []  # (end, lane)
+    next_lane = 0
+    for i in order:
+        start, end = intervals[i]
+        if free and free[0][0] <= start:
+            _, lane = heapq.heappop(free)
+        else:
+            lane = next_lane
+            next_lane += 1
+        lanes[i] = lane
+        heapq.heappush(free, (end, lane))
+    return lanes
+
+
+def parallelism_profile(intervals):
+    """Step function of concurrently running intervals as [t, active] points."""
+    events = sorted([(s, 1) for s, _ in intervals] + [(e, -1) for _, e in intervals])
+    profile = []
+    active = 0
+    for t, delta in events:
+        active += delta
+        if profile and profile[-1][0] == t:
+            profile[-1][1] = active
+        else:
+            profile.append([t, active])
+    return profile
+
+
+class TimelineRecorder:
+    """Collects timeline events while the parser streams the messages.
+
+    record() takes every message once and keeps only timestamps and ids;
+    build() turns them into the timeline dict and the step spans.
+    """
+
+    def __init__(self):
+        self.run_start = self.run_end = None
+        self.case_started = {}    # scenario_run_id -> (start_ms, workerId)
+        self.case_finished = {}   # scenario_run_id -> end_ms
+        self.last_step_end = {}   # scenario_run_id -> latest step end_ms
+        self.step_pending = {}    # (scenario_run_id, testStepId) -> start_ms, until it finishes
+        self.step_labels = {}     # testStepId -> step text or hook label
+        self.pickle_step_text = {}
+        # Finished step spans as parallel columns; times are absolute until build().
+        self.step_run_ids = []
+        self.step_texts = []
+        self.step_statuses = []
+        self.step_starts = array('d')
+        self.step_ends = array('d')
+
+    def record(self, msg):
+        if 'testStepFinished' in msg:
+            tsf = msg['testStepFinished']
+            run_id = tsf['testCaseStartedId']
+            end = timestamp_ms(tsf.get('timestamp'))
+            if end is None:
+                return
+            if end > self.last_step_end.get(run_id, float('-inf')):
+                self.last_step_end[run_id] = end
+            start = self.step_pending.pop((run_id, tsf['testStepId']), None)
+            if start is not None:
+                self.step_run_ids.append(run_id)
+                self.step_texts.append(self.step_labels.get(tsf['testStepId'], ''))
+                self.step_statuses.append(intern(tsf.get('testStepResult', {}).get('status') or ''))
+                self.step_starts.append(start)
+                self.step_ends.append(end)
+        elif 'testStepStarted' in msg:
+            tss = msg['testStepStarted']
+            start = timestamp_ms(tss.get('timestamp'))
+            if start is not None:
+                self.step_pending[(tss['testCaseStartedId'], tss['testStepId'])] = start
+        elif 'testCaseStarted' in msg:
+            tcs = msg['testCaseStarted']
+            self.case_started[tcs['id']] = (timestamp_ms(tcs.get('timestamp')), tcs.get('workerId'))
+        elif 'testCaseFinished' in msg:
+            tcf = msg['testCaseFinished']
+            self.case_finished[tcf['testCaseStartedId']] = timestamp_ms(tcf.get('timestamp'))
+        elif 'testCase' in msg:
+            for ts in msg['testCase'].get('testSteps', []):
+                if 'pickleStepId' in ts:
+                    self.step_labels[ts['id']] = self.pickle_step_text.get(ts['pickleStepId'], '')
+                else:
+                    self.step_labels[ts['id']] = 'Hook'
+        elif 'pickle' in msg:
+            for st in msg['pickle'].get('steps', []):
+                self.pickle_step_text[st['id']] = intern(mask_sensitive((st.get('text') or '').strip()))
+        elif 'testRunStarted' in msg:
+            self.run_start = timestamp_ms(msg['testRunStarted'].get('timestamp'))
+        elif 'testRunFinished' in msg:
+            self.run_end = timestamp_ms(msg['testRunFinished'].get('timestamp'))
+
+    def build(self, run_names, run_status):
+        """Return the timeline dict and a DataFrame of step spans (STEP_COLUMNS).
+
+        run_names maps scenario_run_id -> (feature_name, scenario_name) and
+        run_status maps scenario_run_id -> final status, both from the parser.
+        """
+        self.step_pending.clear()
+        timeline, origin = build_timeline(
+            self.run_start, self.run_end, self.case_started, self.case_finished,
+            self.last_step_end, run_names, run_status,
+        )
+        steps = pd.DataFrame({
+            'scenario_run_id': self.step_run_ids,
+            'step': self.step_texts,
+            'status': self.step_statuses,
+            'start_ms': self.step_starts,
+            'end_ms': self.step_ends,
+        }, columns=STEP_COLUMNS)
+        if origin is not None:
+            steps['start_ms'] = (steps['start_ms'] - origin).round(3)
+            steps['end_ms'] = (steps['end_ms'] - origin).round(3)
+            steps = steps.sort_values('start_ms', kind='stable')
+        return timeline, steps
+
+
+def build_timeline(run_start, run_end, case_started, case_finished, last_step_end, run_names, run_status):
+    """Return the timeline dict written next to the parsed CSV and its origin.
+
+    Times are absolute milliseconds as recorded by TimelineRecorder; a
+    missing testCaseFinished falls back to the last step that finished.
+    """
+    run_ids = []
+    intervals = []
+    workers = []
+    for run_id, (start, worker) in case_started.items():
+        end = case_finished.get(run_id, last_step_end.get(run_id))
+        if start is None or end is None:
+            continue
+        run_ids.append(run_id)
+        intervals.append((start, max(start, end)))
+        workers.append(worker)
+    if not run_ids:
+        return {'run': {}, 'scenarios': [], 'parallelism': [], 'critical_path': []}, None
+
+    origin = run_start if run_start is not None else min(s for s, _ in intervals)
+    horizon = max(run_end if run_end is not None else float('-inf'), max(e for _, e in intervals))
+
+    # Lanes come from workerId only when the runner reported distinct workers
+    # that never overlap with themselves; otherwise they are inferred.
+    lanes = assign_lanes(intervals)
+    distinct_workers = sorted(set(w for w in workers if w is not None))
+    if len(distinct_workers) > 1 and None not in workers:
+        by_worker = {}
+        for (s, e), w in zip(intervals, workers):
+            by_worker.setdefault(w, []).append((s, e))
+        if all(max(assign_lanes(iv)) == 0 for iv in by_worker.values()):
+            lane_of = {w: i for i, w in enumerate(distinct_workers)}
+            lanes = [lane_of[w] for w in workers]
+    lane_count = max(lanes) + 1
+
+    scenarios = []
+    for run_id, (start, end), lane, worker in zip(run_ids, intervals, lanes, workers):
+        feature_name, scenario_name = run_names.get(run_id, (None, None))
+        scenarios.append({
+            'scenario_run_id': run_id,
+            'feature_name': feature_name,
+            'scenario_name': scenario_name,
+            'status': run_status.get(run_id),
+            'worker': worker,
+            'lane': lane,
+            'start_ms': round(start - origin, 3),
+            'end_ms': round(end - origin, 3),
+        })
+    scenarios.sort(key=lambda r: (r['lane'], r['start_ms']))
+
+    profile = parallelism_profile(intervals)
+    wall_ms = horizon - origin
+    busy_ms = 0.0       # time with at least one scenario running
+    lane_ms = 0.0       # integral of active scenarios over time
+    for (t, active), (t_next, _) in zip(profile, profile[1:]):
+        if active > 0:
+            busy_ms += t_next - t
+            lane_ms += active * (t_next - t)
+
+    # Lanes run their scenarios back to back, so the run ends with the lane
+    # whose last scenario finishes latest; walking that lane backwards gives
+    # the chain (and the gaps between links) that bounded wall-clock time.
+    last = max(scenarios, key=lambda r: r['end_ms'])
+    chain = [r for r in scenarios if r['lane'] == last['lane'] and r['end_ms'] <= last['end_ms']]
+    critical_path = []
+    prev_end = 0.0
+    for r in chain:
+        critical_path.append({
+            'scenario_run_id': r['scenario_run_id'],
+            'feature_name': r['feature_name'],
+            'scenario_name': r['scenario_name'],
+            'start_ms': r['start_ms'],
+            'end_ms': r['end_ms'],
+            'duration_ms': round(r['end_ms'] - r['start_ms'], 3),
+            'wait_before_ms': round(max(0.0, r['start_ms'] - prev_end), 3),
+        })
+        prev_end = r['end_ms']
+
+    run = {
+        'wall_ms': round(wall_ms, 3),
+        'busy_ms': round(busy_ms, 3),
+        'idle_ms': round(wall_ms - busy_ms, 3),
+        'lanes': lane_count,
+        'lane_idle_ms': round(lane_count * wall_ms - lane_ms, 3),
+        'avg_parallelism': round(lane_ms / wall_ms, 3) if wall_ms else 0.0,
+        'max_parallelism': max(a for _, a in profile),
+        'critical_path_ms': round(sum(c['duration_ms'] for c in critical_path), 3),
+        'critical_path_wait_ms': round(sum(c['wait_before_ms'] for c in critical_path), 3),
+    }
+    return {
+        'run': run,
+        'scenarios': scenarios,
+        'parallelism': [{'t_ms': round(t - origin, 3), 'active': a} for t, a in profile],
+        'critical_path': critical_path,
+    }, origin